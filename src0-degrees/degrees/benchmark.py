@@ -0,0 +1,190 @@
+"""
+Benchmark runner for degrees.
+
+Loads a data directory into each store in a fresh process and reports
+load time, peak RSS, people expanded and p50/p99 query latency for
+every search strategy over the same random person pairs. Results are
+written as JSON so runs can be compared for regressions.
+
+    python benchmark.py data --generate 1000000 --queries 200
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import degrees
+import snapshot
+import synthetic
+from graph import Graph
+from ingest import peak_memory
+
+# Stores to benchmark: "graph" builds from CSV, "snapshot" maps a
+# snapshot compiled beforehand
+STORES = ("dict", "graph", "snapshot")
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies, expanded, found):
+    return {
+        "queries": len(latencies),
+        "connected": found,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "mean_expanded": round(sum(expanded) / len(expanded), 1),
+        "max_expanded": max(expanded),
+    }
+
+
+def peak_rss_kb():
+    return peak_memory().get("peak_rss_kb")
+
+
+def compile_snapshot(directory):
+    """
+    Writes the snapshot for a data directory.
+    """
+    snapshot.load(directory)
+
+
+def bench_store(directory, store, searches, pairs):
+    """
+    Loads one store and times every applicable search over the pairs.
+    Meant to run in its own process so peak RSS is per store.
+    """
+    start = time.perf_counter()
+    if store == "dict":
+        degrees.load_data(directory)
+        available = degrees.SEARCHES
+    elif store == "graph":
+        # Time the CSV build alone, without writing a snapshot
+        degrees.graph = Graph.from_csv(directory)
+        degrees.graph_directory = directory
+        available = degrees.GRAPH_SEARCHES
+    else:
+        degrees.load_graph(directory)
+        available = degrees.GRAPH_SEARCHES
+    result = {
+        "load_seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_after_load_kb": peak_rss_kb(),
+        "searches": {},
+    }
+
+    for name in searches:
+        if name not in available:
+            continue
+        search = available[name]
+        entry = {}
+        if name == "alt":
+            start = time.perf_counter()
+            degrees.load_landmarks()
+            entry["prepare_seconds"] = round(time.perf_counter() - start, 3)
+
+        latencies, expanded, found = [], [], 0
+        for source, target in pairs:
+            start = time.perf_counter()
+            path = search(source, target)
+            latencies.append(time.perf_counter() - start)
+            expanded.append(degrees.expanded)
+            found += path is not None
+        entry.update(summarize(latencies, expanded, found))
+        result["searches"][name] = entry
+
+    result["peak_rss_kb"] = peak_rss_kb()
+    return result
+
+
+def choose_pairs(directory, count, seed):
+    """
+    Returns count random (source, target) pairs of people with credits.
+    """
+    with open(os.path.join(directory, "stars.csv"), encoding="utf-8") as f:
+        person_ids = sorted({row["person_id"] for row in csv.DictReader(f)})
+    rng = random.Random(seed)
+    return [(rng.choice(person_ids), rng.choice(person_ids))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees searches")
+    parser.add_argument("directory")
+    parser.add_argument("--generate", type=int, metavar="CREDITS",
+                        help="first write a synthetic dataset of this size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--stores", nargs="+", default=list(STORES),
+                        choices=STORES)
+    parser.add_argument("--searches", nargs="+",
+                        default=[*degrees.SEARCHES, *degrees.GRAPH_SEARCHES])
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+
+    report = {
+        "directory": args.directory,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "queries": args.queries,
+        "seed": args.seed,
+    }
+    if args.generate:
+        print(f"Generating {args.generate} credits...", file=sys.stderr)
+        start = time.perf_counter()
+        people, movies, credits = synthetic.generate(
+            args.directory, args.generate, args.seed
+        )
+        report["dataset"] = {
+            "people": people, "movies": movies, "credits": credits,
+            "generate_seconds": round(time.perf_counter() - start, 3),
+        }
+
+    pairs = choose_pairs(args.directory, args.queries, args.seed)
+
+    # A fresh interpreter per store keeps load times and RSS independent
+    context = multiprocessing.get_context("spawn")
+    report["stores"] = {}
+    for store in args.stores:
+        print(f"Benchmarking {store} store...", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as scratch:
+            # Graph stores write their snapshot and landmark index next
+            # to a copy of the CSV files, leaving the user's caches alone
+            directory = args.directory
+            if store != "dict":
+                for name in snapshot.SOURCES:
+                    shutil.copy2(os.path.join(args.directory, name), scratch)
+                directory = scratch
+            if store == "snapshot":
+                with context.Pool(1) as pool:
+                    pool.apply(compile_snapshot, (directory,))
+            with context.Pool(1) as pool:
+                report["stores"][store] = pool.apply(
+                    bench_store, (directory, store, args.searches, pairs)
+                )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(json.dumps(report["stores"], indent=2))
+    print(f"Results written to {args.output}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
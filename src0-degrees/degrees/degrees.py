@@ -1,6 +1,11 @@
 import csv
+import os
 import sys
 
+import ingest
+import landmarks
+import nameindex
+import snapshot
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,6 +17,21 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Array-backed store used by the graph searches instead of the dicts above
+graph = None
+
+# Data directory the graph was loaded from
+graph_directory = None
+
+# Landmark distance index over graph, built on first use
+landmark_index = None
+
+# Prefix and fuzzy index over the names of whichever store is loaded
+name_index = None
+
+# People expanded by the most recent search
+expanded = 0
+
 
 def load_data(directory):
     """
@@ -53,18 +73,177 @@ def load_data(directory):
                 pass
 
 
+def load_graph(directory, workers=None):
+    """
+    Load data into the compact array-backed graph, memory mapping
+    the compiled snapshot when the CSV files have not changed.
+
+    If workers is given, a stale snapshot is rebuilt by parsing the
+    CSV files in that many parallel processes.
+    """
+    global graph, graph_directory, landmark_index
+    if workers:
+        graph = snapshot.load(
+            directory, lambda d: ingest.load_graph(d, workers)[0]
+        )
+    else:
+        graph = snapshot.load(directory)
+    graph_directory = directory
+    landmark_index = None
+
+
+def load_landmarks(count=landmarks.DEFAULT_COUNT):
+    """
+    Load the landmark index for the loaded graph, building it if needed.
+    """
+    global landmark_index
+    landmark_index = landmarks.load(graph_directory, graph, count)
+
+
+def read_delta(directory):
+    """
+    Reads whichever of people.csv, movies.csv and stars.csv a delta
+    directory holds, returning lists of people, movie and star rows.
+    """
+    rows = []
+    for filename, fields in ingest.COLUMNS.items():
+        try:
+            with open(f"{directory}/{filename}", encoding="utf-8") as f:
+                rows.append([tuple(row[field] for field in fields)
+                             for row in csv.DictReader(f)])
+        except FileNotFoundError:
+            rows.append([])
+    return rows
+
+
+def apply_delta(directory):
+    """
+    Applies delta CSV files with new people, movies and star rows to
+    the loaded store, and to the on-disk snapshot and landmark index
+    when the graph is loaded. Returns the set of person_ids that
+    gained credits, the only people new shortest paths can go through.
+    """
+    global graph, name_index
+    people_rows, movie_rows, star_rows = read_delta(directory)
+
+    if graph is None:
+        for person_id, name, birth in people_rows:
+            if person_id in people:
+                continue
+            people[person_id] = {"name": name, "birth": birth, "movies": set()}
+            names.setdefault(name.lower(), set()).add(person_id)
+        for movie_id, title, year in movie_rows:
+            if movie_id in movies:
+                continue
+            movies[movie_id] = {"title": title, "year": year, "stars": set()}
+        touched = set()
+        for person_id, movie_id in star_rows:
+            if person_id not in people or movie_id not in movies:
+                continue
+            if movie_id not in people[person_id]["movies"]:
+                people[person_id]["movies"].add(movie_id)
+                movies[movie_id]["stars"].add(person_id)
+                touched.add(person_id)
+    else:
+        graph, changed = graph.with_delta(people_rows, movie_rows, star_rows)
+        touched = {graph.person_ids[p] for p in changed}
+        sources = snapshot.source_stats(graph_directory)
+        try:
+            snapshot.save(graph, f"{graph_directory}/{snapshot.SNAPSHOT_NAME}",
+                          sources)
+        except OSError:
+            pass
+        landmarks_path = f"{graph_directory}/{landmarks.LANDMARKS_NAME}"
+        if landmark_index is not None:
+            landmark_index.apply_delta(graph, changed)
+            try:
+                landmark_index.save(landmarks_path, sources)
+            except OSError:
+                pass
+        else:
+            # The CSV stats and person count still match the old index
+            # file, so it would be loaded with distances the new credits
+            # have shortened; drop it so the next load rebuilds it
+            try:
+                os.remove(landmarks_path)
+            except OSError:
+                pass
+
+    if people_rows and name_index is not None:
+        load_name_index()
+    return touched
+
+
+def distances_from(person_ids, radius=None):
+    """
+    Returns a dict with the number of hops from the nearest of the
+    given people to every person within radius hops of them.
+    """
+    distances = {person_id: 0 for person_id in person_ids}
+    layer = list(distances)
+    depth = 0
+    while layer and (radius is None or depth < radius):
+        depth += 1
+        next_layer = []
+        for person_id in layer:
+            if graph is not None:
+                p = graph.person_index[person_id]
+                neighbors = [graph.person_ids[q]
+                             for _, q in graph.neighbors_for_person(p)]
+            else:
+                neighbors = [q for _, q in neighbors_for_person(person_id)]
+            for neighbor in neighbors:
+                if neighbor not in distances:
+                    distances[neighbor] = depth
+                    next_layer.append(neighbor)
+        layer = next_layer
+    return distances
+
+
+def load_name_index():
+    """
+    Build the prefix/fuzzy name index for whichever store is loaded.
+    """
+    global name_index
+    if graph is not None:
+        name_index = nameindex.NameIndex(graph.person_names)
+    else:
+        name_index = nameindex.NameIndex(names)
+
+
+def suggest_names(name, limit=5):
+    """
+    Returns up to limit known names close to a mistyped name,
+    fuzzy matches first and then prefix completions.
+    """
+    if name_index is None:
+        load_name_index()
+    suggestions = [match for _, match in name_index.fuzzy(name, limit=limit)]
+    for match in name_index.complete(name, limit=limit):
+        if match not in suggestions:
+            suggestions.append(match)
+    return suggestions[:limit]
+
+
 ## A node is initial state of an 
 
 ## Source has movies
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python degrees.py [directory] [search]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    search = sys.argv[2] if len(sys.argv) == 3 else "bfs"
+    if search not in SEARCHES and search not in GRAPH_SEARCHES:
+        choices = ", ".join([*SEARCHES, *GRAPH_SEARCHES])
+        sys.exit(f"Unknown search, choose one of: {choices}")
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    if search in GRAPH_SEARCHES:
+        load_graph(directory)
+    else:
+        load_data(directory)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -74,7 +253,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = (GRAPH_SEARCHES.get(search) or SEARCHES[search])(source, target)
 
     if path is None:
         return
@@ -83,9 +262,9 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_details(path[i][1])[0]
+            person2 = person_details(path[i + 1][1])[0]
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
@@ -97,6 +276,8 @@ def shortest_path(source, target):
     If no possible path, returns None.
     """
 
+    global expanded
+    expanded = 0
     if source == target:
         return []
     
@@ -110,6 +291,7 @@ def shortest_path(source, target):
         if frontier.empty():
             return None
         node = frontier.remove()
+        expanded += 1
         for movie, neighbor in neighbors_for_person(node.state):
             if not frontier.contains_state(neighbor) and neighbor not in explored:
                 child = Node(neighbor, node, movie)
@@ -122,22 +304,259 @@ def shortest_path(source, target):
                     return movies_and_persons
                 explored.add(neighbor)
                 frontier.add(child)
-                        
-        
+
+
+def shortest_path_by_movie(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    People and movies are treated as the two sides of a bipartite
+    graph, so every movie is marked as explored the first time it is
+    reached and its cast is scanned at most once.
+
+    If no possible path, returns None.
+    """
+
+    global expanded
+    expanded = 0
+    if source == target:
+        return []
+
+    start = Node(source, parent=None, action=None)
+    frontier = QueueFrontier()
+    frontier.add(start)
+    explored = {source}
+    explored_movies = set()
+
+    while not frontier.empty():
+        node = frontier.remove()
+        expanded += 1
+        for movie_id in people[node.state]["movies"]:
+            if movie_id in explored_movies:
+                continue
+            explored_movies.add(movie_id)
+            for person_id in movies[movie_id]["stars"]:
+                if person_id in explored:
+                    continue
+                child = Node(person_id, node, movie_id)
+                if person_id == target:
+                    movies_and_persons = []
+                    while child.parent is not None:
+                        movies_and_persons.append((child.action, child.state))
+                        child = child.parent
+                    movies_and_persons.reverse()
+                    return movies_and_persons
+                explored.add(person_id)
+                frontier.add(child)
+
+    return None
+
+
+def shortest_path_bidirectional(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both
+    ends at once and stopping when the two frontiers meet.
+
+    If no possible path, returns None.
+    """
+
+    global expanded
+    expanded = 0
+    if source == target:
+        return []
+
+    # Maps each reached person to the (person_id, movie_id) it was reached from
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Always grow the smaller side, it is the cheaper one to expand
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(forward_layer, forward, backward)
+        else:
+            backward_layer, meeting = expand_layer(backward_layer, backward, forward)
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(layer, parents, other_parents):
+    """
+    Expands every person in a BFS layer, recording parents for newly
+    reached people. Returns the next layer and the meeting person
+    with the shortest combined distance, or None if the searches
+    have not met yet.
+    """
+    global expanded
+    next_layer = []
+    meeting = None
+    best = None
+    for person_id in layer:
+        expanded += 1
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (person_id, movie_id)
+            next_layer.append(neighbor)
+            if neighbor in other_parents:
+                distance = path_length(neighbor, other_parents)
+                if best is None or distance < best:
+                    best = distance
+                    meeting = neighbor
+    return next_layer, meeting
+
+
+def path_length(person_id, parents):
+    """
+    Returns how many hops separate a person from the root of a parents map.
+    """
+    length = 0
+    while parents[person_id] is not None:
+        person_id = parents[person_id][0]
+        length += 1
+    return length
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Builds the (movie_id, person_id) path through the meeting person
+    out of the forward and backward parent maps.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        parent, movie_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        child, movie_id = backward[person_id]
+        path.append((movie_id, child))
+        person_id = child
+    return path
+
+
+def shortest_path_csr(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching the
+    array-backed graph.
+
+    If no possible path, returns None.
+    """
+    global expanded
+    path = graph.shortest_path(graph.person_index[source],
+                               graph.person_index[target])
+    expanded = graph.expanded
+    if path is None:
+        return None
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
+def shortest_path_alt(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using a bidirectional
+    search pruned by the landmark index.
+
+    If no possible path, returns None.
+    """
+    global expanded
+    if landmark_index is None:
+        load_landmarks()
+    path = landmark_index.shortest_path(graph.person_index[source],
+                                        graph.person_index[target])
+    expanded = landmark_index.expanded
+    if path is None:
+        return None
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation
+    between two people, read from the landmark index.
+    """
+    if landmark_index is None:
+        load_landmarks()
+    return landmark_index.bounds(graph.person_index[source],
+                                 graph.person_index[target])
+
+
+def person_ids_for_name(name):
+    """
+    Returns every IMDB id matching a person's name.
+    """
+    if graph is not None:
+        return [graph.person_ids[p] for p in graph.names.get(name.lower(), [])]
+    return list(names.get(name.lower(), set()))
+
+
+def person_details(person_id):
+    """
+    Returns the (name, birth) of a person from whichever store is loaded.
+    """
+    if graph is not None:
+        p = graph.person_index[person_id]
+        return graph.person_names[p], graph.person_births[p]
+    return people[person_id]["name"], people[person_id]["birth"]
+
+
+def movie_title(movie_id):
+    """
+    Returns the title of a movie from whichever store is loaded.
+    """
+    if graph is not None:
+        return graph.movie_titles[graph.movie_index[movie_id]]
+    return movies[movie_id]["title"]
+
+
+def shortest_path_csr_by_movie(source, target):
+    """
+    Same as shortest_path_csr, but scans each movie's cast at most once.
+    """
+    global expanded
+    path = graph.shortest_path_by_movie(graph.person_index[source],
+                                        graph.person_index[target])
+    expanded = graph.expanded
+    if path is None:
+        return None
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
+        suggestions = suggest_names(name)
+        if not suggestions:
+            return None
+        print(f"No '{name}'. Did you mean:")
+        for i, suggestion in enumerate(suggestions, 1):
+            print(f"{i}: {suggestion}")
+        try:
+            choice = int(input("Intended name number: "))
+            if 1 <= choice <= len(suggestions):
+                return person_id_for_name(suggestions[choice - 1])
+        except (ValueError, EOFError):
+            pass
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name, birth = person_details(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -163,5 +582,20 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+# Search strategies selectable from the command line
+SEARCHES = {
+    "bfs": shortest_path,
+    "bidirectional": shortest_path_bidirectional,
+    "movies": shortest_path_by_movie,
+}
+
+# Search strategies that run on the array-backed graph
+GRAPH_SEARCHES = {
+    "csr": shortest_path_csr,
+    "csr-movies": shortest_path_csr_by_movie,
+    "alt": shortest_path_alt,
+}
+
+
 if __name__ == "__main__":
     main()
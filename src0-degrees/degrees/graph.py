@@ -0,0 +1,582 @@
+import csv
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class Graph():
+    """
+    Array-backed people/movies graph.
+
+    Person and movie IMDB ids are interned to dense integers. The
+    person -> movies and movie -> stars relations are stored in CSR
+    form: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the
+    same layout holds for movie_stars / movie_offsets.
+
+    Graphs built by from_rows and with_delta keep their string columns
+    packed in StringTables and answer id and name lookups from
+    SortedIndexes, the same layout a mapped snapshot has, so no Python
+    object is held per person, movie or credit.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 person_index=None, movie_index=None, names=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        # Lookups not given are built from the interned columns
+        if person_index is None:
+            person_index = {
+                person_id: p for p, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {
+                movie_id: m for m, movie_id in enumerate(movie_ids)
+            }
+        if names is None:
+            names = {}
+            for p, name in enumerate(person_names):
+                names.setdefault(name.lower(), []).append(p)
+        self.person_index = person_index
+        self.movie_index = movie_index
+        # Maps lowercase names to a list of person numbers
+        self.names = names
+        # People expanded by the most recent search
+        self.expanded = 0
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Load people.csv, movies.csv and stars.csv into a new graph.
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as people, \
+                open(f"{directory}/movies.csv", encoding="utf-8") as movies, \
+                open(f"{directory}/stars.csv", encoding="utf-8") as stars:
+            return cls.from_rows(
+                ((row["id"], row["name"], row["birth"])
+                 for row in csv.DictReader(people)),
+                ((row["id"], row["title"], row["year"])
+                 for row in csv.DictReader(movies)),
+                ((row["person_id"], row["movie_id"])
+                 for row in csv.DictReader(stars)),
+            )
+
+    @classmethod
+    def from_rows(cls, people_rows, movie_rows, star_rows):
+        """
+        Interns (id, name, birth), (id, title, year) and
+        (person_id, movie_id) rows into a new graph, keeping the first
+        record for duplicated ids and dropping credits for unknown
+        people or movies.
+        """
+        person_index = {}
+        person_ids, person_names, person_births = intern_rows(
+            people_rows, person_index
+        )
+        movie_index = {}
+        movie_ids, movie_titles, movie_years = intern_rows(
+            movie_rows, movie_index
+        )
+
+        credit_people = array("i")
+        credit_movies = array("i")
+        for person_id, movie_id in star_rows:
+            p = person_index.get(person_id)
+            m = movie_index.get(movie_id)
+            if p is not None and m is not None:
+                credit_people.append(p)
+                credit_movies.append(m)
+
+        person_offsets, person_movies, movie_offsets, movie_stars = build_csr(
+            len(person_ids), len(movie_ids), credit_people, credit_movies
+        )
+        return cls.packed(person_ids, person_names, person_births,
+                          movie_ids, movie_titles, movie_years,
+                          person_offsets, person_movies,
+                          movie_offsets, movie_stars)
+
+    @classmethod
+    def packed(cls, person_ids, person_names, person_births,
+               movie_ids, movie_titles, movie_years,
+               person_offsets, person_movies, movie_offsets, movie_stars):
+        """
+        Returns a graph over lists of strings with the lists packed
+        into StringTables and lookups sorted into SortedIndexes.
+        Columns already packed into StringTables are kept as they are.
+        """
+        person_id_order = sorted_order(person_ids)
+        movie_id_order = sorted_order(movie_ids)
+        name_order = sorted_order([name.lower() for name in person_names])
+        person_ids = StringTable.pack(person_ids)
+        movie_ids = StringTable.pack(movie_ids)
+        person_names = StringTable.pack(person_names)
+        return cls(person_ids, person_names, StringTable.pack(person_births),
+                   movie_ids, StringTable.pack(movie_titles),
+                   StringTable.pack(movie_years),
+                   person_offsets, person_movies, movie_offsets, movie_stars,
+                   person_index=SortedIndex(person_ids, person_id_order),
+                   movie_index=SortedIndex(movie_ids, movie_id_order),
+                   names=SortedIndex(person_names, name_order,
+                                     lower=True, unique=False))
+
+    def with_delta(self, people_rows, movie_rows, star_rows):
+        """
+        Returns a new graph with extra (id, name, birth), (id, title, year)
+        and (person_id, movie_id) rows merged in, and the set of person
+        numbers that gained credits.
+
+        Existing people and movies keep their numbers; new ones are
+        numbered after them. Rows for ids already present are ignored,
+        as they are when loading. The graph must be packed, as from_rows
+        and open_snapshot return it: new strings are appended to copies
+        of the existing buffers and only new rows are merged into the
+        sorted indexes, so nothing already stored is decoded or re-sorted.
+        """
+        person_count = self.person_count()
+        movie_count = self.movie_count()
+        new_people = {}
+        person_ids, person_names, person_births = intern_rows(
+            people_rows, new_people, person_count, self.person_index
+        )
+        new_movies = {}
+        movie_ids, movie_titles, movie_years = intern_rows(
+            movie_rows, new_movies, movie_count, self.movie_index
+        )
+
+        # Maps person -> new movies and movie -> new stars
+        person_additions = {}
+        movie_additions = {}
+        for person_id, movie_id in star_rows:
+            p = new_people.get(person_id)
+            if p is None:
+                p = self.person_index.get(person_id)
+            m = new_movies.get(movie_id)
+            if m is None:
+                m = self.movie_index.get(movie_id)
+            if p is None or m is None:
+                continue
+            if p < person_count and m in self.movies_of(p):
+                continue
+            movies = person_additions.setdefault(p, set())
+            if m in movies:
+                continue
+            movies.add(m)
+            movie_additions.setdefault(m, set()).add(p)
+
+        person_offsets, person_movies = extend_csr(
+            self.person_offsets, self.person_movies,
+            person_count + len(person_ids), person_additions
+        )
+        movie_offsets, movie_stars = extend_csr(
+            self.movie_offsets, self.movie_stars,
+            movie_count + len(movie_ids), movie_additions
+        )
+
+        new_person_rows = range(person_count, person_count + len(person_ids))
+        new_movie_rows = range(movie_count, movie_count + len(movie_ids))
+        if person_ids:
+            person_names = self.person_names.extended(person_names)
+            person_births = self.person_births.extended(person_births)
+            person_ids = self.person_ids.extended(person_ids)
+            person_index = self.person_index.inserted(
+                person_ids, new_person_rows
+            )
+            names = self.names.inserted(person_names, new_person_rows)
+        else:
+            person_ids, person_names = self.person_ids, self.person_names
+            person_births = self.person_births
+            person_index, names = self.person_index, self.names
+        if movie_ids:
+            movie_titles = self.movie_titles.extended(movie_titles)
+            movie_years = self.movie_years.extended(movie_years)
+            movie_ids = self.movie_ids.extended(movie_ids)
+            movie_index = self.movie_index.inserted(
+                movie_ids, new_movie_rows
+            )
+        else:
+            movie_ids, movie_titles = self.movie_ids, self.movie_titles
+            movie_years = self.movie_years
+            movie_index = self.movie_index
+
+        graph = Graph(person_ids, person_names, person_births,
+                      movie_ids, movie_titles, movie_years,
+                      person_offsets, person_movies, movie_offsets, movie_stars,
+                      person_index=person_index, movie_index=movie_index,
+                      names=names)
+        return graph, set(person_additions)
+
+    def person_count(self):
+        return len(self.person_ids)
+
+    def movie_count(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, p):
+        """
+        Returns the movie numbers person p starred in.
+        """
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        """
+        Returns the person numbers who starred in movie m.
+        """
+        return self.movie_stars[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def neighbors_for_person(self, p):
+        """
+        Returns (movie, person) number pairs for people
+        who starred with person p.
+        """
+        neighbors = set()
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                neighbors.add((m, q))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) number pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        self.expanded = 0
+        if source == target:
+            return []
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        # parent_person[q] == -1 means q has not been reached yet
+        parent_person = array("i", [-1]) * self.person_count()
+        parent_movie = array("i", [-1]) * self.person_count()
+        parent_person[source] = source
+        layer = [source]
+
+        while layer:
+            next_layer = []
+            for p in layer:
+                self.expanded += 1
+                for i in range(person_offsets[p], person_offsets[p + 1]):
+                    m = person_movies[i]
+                    for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                        q = movie_stars[j]
+                        if parent_person[q] != -1:
+                            continue
+                        parent_person[q] = p
+                        parent_movie[q] = m
+                        if q == target:
+                            return trace_path(parent_person, parent_movie,
+                                              source, target)
+                        next_layer.append(q)
+            layer = next_layer
+
+        return None
+
+    def shortest_path_by_movie(self, source, target):
+        """
+        Returns the shortest list of (movie, person) number pairs
+        that connect the source to the target, marking movies as
+        explored so each cast list is scanned at most once.
+
+        If no possible path, returns None.
+        """
+        self.expanded = 0
+        if source == target:
+            return []
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        parent_person = array("i", [-1]) * self.person_count()
+        parent_movie = array("i", [-1]) * self.person_count()
+        explored_movies = bytearray(self.movie_count())
+        parent_person[source] = source
+        layer = [source]
+
+        while layer:
+            next_layer = []
+            for p in layer:
+                self.expanded += 1
+                for i in range(person_offsets[p], person_offsets[p + 1]):
+                    m = person_movies[i]
+                    if explored_movies[m]:
+                        continue
+                    explored_movies[m] = 1
+                    for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                        q = movie_stars[j]
+                        if parent_person[q] != -1:
+                            continue
+                        parent_person[q] = p
+                        parent_movie[q] = m
+                        if q == target:
+                            return trace_path(parent_person, parent_movie,
+                                              source, target)
+                        next_layer.append(q)
+            layer = next_layer
+
+        return None
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one utf-8 blob
+    plus an array of byte offsets, decoded on access.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def pack(cls, values):
+        """
+        Returns a table holding a sequence of strings, or the sequence
+        itself if it is already a table.
+        """
+        if isinstance(values, StringTable):
+            return values
+        offsets = array("q", [0])
+        data = bytearray()
+        for value in values:
+            data += value.encode("utf-8")
+            offsets.append(len(data))
+        return cls(offsets, bytes(data))
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Returns a table holding the strings of several tables in order,
+        joining their buffers without decoding them.
+        """
+        offsets = array("q", [0])
+        data = bytearray()
+        for table in tables:
+            offsets.extend(map(len(data).__add__, table.offsets[1:]))
+            data += table.data
+        return cls(offsets, bytes(data))
+
+    def extended(self, values):
+        """
+        Returns a table holding these strings followed by values. The
+        existing buffers are copied as bytes, never decoded.
+        """
+        offsets = array("q")
+        offsets.frombytes(memoryview(self.offsets).cast("B"))
+        data = bytearray(self.data)
+        for value in values:
+            data += value.encode("utf-8")
+            offsets.append(len(data))
+        return StringTable(offsets, bytes(data))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        data = self.data
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield str(data[offsets[i]:offsets[i + 1]], "utf-8")
+
+
+class SortedIndex():
+    """
+    Mapping from a key to row numbers, answered by binary search
+    over a permutation that orders a column by key.
+    """
+
+    def __init__(self, column, order, lower=False, unique=True):
+        self.column = column
+        self.order = order
+        self.lower = lower
+        self.unique = unique
+
+    def key(self, row):
+        value = self.column[row]
+        return value.lower() if self.lower else value
+
+    def rows(self, key):
+        """
+        Returns every row whose key equals the given key.
+        """
+        i = bisect_left(self.order, key, key=self.key)
+        rows = []
+        while i < len(self.order) and self.key(self.order[i]) == key:
+            rows.append(self.order[i])
+            i += 1
+        return rows
+
+    def get(self, key, default=None):
+        rows = self.rows(key)
+        if not rows:
+            return default
+        return rows[0] if self.unique else rows
+
+    def __getitem__(self, key):
+        rows = self.rows(key)
+        if not rows:
+            raise KeyError(key)
+        return rows[0] if self.unique else rows
+
+    def __contains__(self, key):
+        return bool(self.rows(key))
+
+    def inserted(self, column, rows):
+        """
+        Returns an index over column, which extends this index's column
+        with the given rows, merging those rows into the existing order.
+        Rows tying with existing keys go after them, as a fresh sort
+        would place them.
+        """
+        index = SortedIndex(column, self.order, self.lower, self.unique)
+        order = array("i")
+        start = 0
+        for key, row in sorted((index.key(row), row) for row in rows):
+            end = bisect_right(self.order, key, lo=start, key=index.key)
+            order.frombytes(memoryview(self.order[start:end]).cast("B"))
+            order.append(row)
+            start = end
+        order.frombytes(memoryview(self.order[start:]).cast("B"))
+        index.order = order
+        return index
+
+
+def intern_rows(rows, index, start=0, known=()):
+    """
+    Numbers (id, field, field) rows from start on, recording each new
+    id in index and skipping ids already in index or in known.
+    Returns lists of the new ids and of their two fields.
+    """
+    ids, firsts, seconds = [], [], []
+    for row_id, first, second in rows:
+        if row_id in index or row_id in known:
+            continue
+        index[row_id] = start + len(ids)
+        ids.append(row_id)
+        firsts.append(first)
+        seconds.append(second)
+    return ids, firsts, seconds
+
+
+def sorted_order(values):
+    """
+    Returns an array of the positions of values in sorted order.
+    """
+    return array("i", sorted(range(len(values)), key=values.__getitem__))
+
+
+def build_csr(person_count, movie_count, credit_people, credit_movies):
+    """
+    Builds the person -> movies and movie -> stars CSR arrays out of
+    parallel arrays of (person, movie) credits, dropping duplicates.
+    Rows list their movies or stars in increasing order.
+    """
+    # Bucket the movies by person, duplicates included
+    person_offsets = array("i", [0]) * (person_count + 1)
+    for p in credit_people:
+        person_offsets[p + 1] += 1
+    for p in range(person_count):
+        person_offsets[p + 1] += person_offsets[p]
+    bucketed = array("i", [0]) * len(credit_movies)
+    fill = array("i", person_offsets[:-1])
+    for p, m in zip(credit_people, credit_movies):
+        bucketed[fill[p]] = m
+        fill[p] += 1
+    del fill
+
+    # Sort and deduplicate each person's movies
+    person_movies = array("i")
+    movie_offsets = array("i", [0]) * (movie_count + 1)
+    start = 0
+    for p in range(person_count):
+        end = person_offsets[p + 1]
+        movies = sorted(set(bucketed[start:end]))
+        person_movies.extend(movies)
+        for m in movies:
+            movie_offsets[m + 1] += 1
+        person_offsets[p + 1] = len(person_movies)
+        start = end
+    del bucketed
+
+    # Scanning people in order leaves every cast sorted
+    for m in range(movie_count):
+        movie_offsets[m + 1] += movie_offsets[m]
+    movie_stars = array("i", [0]) * len(person_movies)
+    fill = array("i", movie_offsets[:-1])
+    for p in range(person_count):
+        for i in range(person_offsets[p], person_offsets[p + 1]):
+            m = person_movies[i]
+            movie_stars[fill[m]] = p
+            fill[m] += 1
+    return person_offsets, person_movies, movie_offsets, movie_stars
+
+
+def extend_csr(offsets, values, count, additions):
+    """
+    Returns new CSR offset and index arrays with count rows: the rows
+    of the given arrays followed by empty rows, with each row in
+    additions merged in and kept sorted.
+    """
+    old_count = len(offsets) - 1
+    new_offsets = array("i", [0])
+    new_values = array("i")
+    start = 0
+    for row in sorted(additions) + [count]:
+        # Copy the untouched existing rows before this one in bulk
+        stop = min(row, old_count)
+        if start < stop:
+            shift = len(new_values) - offsets[start]
+            new_values.frombytes(
+                memoryview(values[offsets[start]:offsets[stop]]).cast("B")
+            )
+            copied = offsets[start + 1:stop + 1]
+            if shift:
+                new_offsets.extend(map(shift.__add__, copied))
+            else:
+                new_offsets.frombytes(memoryview(copied).cast("B"))
+        # New rows without additions are empty
+        for _ in range(max(start, old_count), row):
+            new_offsets.append(len(new_values))
+        if row < count:
+            existing = ()
+            if row < old_count:
+                existing = values[offsets[row]:offsets[row + 1]]
+            new_values.extend(sorted([*existing, *additions[row]]))
+            new_offsets.append(len(new_values))
+        start = row + 1
+    return new_offsets, new_values
+
+
+def trace_path(parent_person, parent_movie, source, target):
+    """
+    Follows parent arrays back from target to source and returns
+    the (movie, person) number pairs in travel order.
+    """
+    path = []
+    q = target
+    while q != source:
+        path.append((parent_movie[q], q))
+        q = parent_person[q]
+    path.reverse()
+    return path
@@ -0,0 +1,260 @@
+"""
+Parallel streaming CSV ingestion for degrees.
+
+people.csv, movies.csv and stars.csv are cut into newline-aligned byte
+ranges that worker processes parse concurrently. people.csv and
+movies.csv are parsed first: workers return the ids of a chunk and its
+other columns packed into StringTables, which the parent joins without
+decoding. Workers forked after that share the id -> number maps and
+turn stars.csv chunks into arrays of person and movie numbers, so the
+parent never walks the rows in Python. Progress and peak memory are
+reported along the way.
+
+Chunks are split on line boundaries, so records must not contain
+embedded newlines (true of the IMDB exports this project ships).
+"""
+import csv
+import io
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import snapshot
+from graph import Graph, StringTable, build_csr, intern_rows
+
+# Bytes of CSV handed to a worker at a time
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Columns read from each file, in the order workers return them
+COLUMNS = {
+    "people.csv": ("id", "name", "birth"),
+    "movies.csv": ("id", "title", "year"),
+    "stars.csv": ("person_id", "movie_id"),
+}
+
+# Person and movie id -> number maps, set in stars.csv workers
+indexes = None
+
+
+def split_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the header row of a CSV file and a list of (start, end)
+    byte ranges covering its records, each ending on a line boundary.
+    """
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8-sig")]))
+        size = os.fstat(f.fileno()).st_size
+        chunks = []
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return header, chunks
+
+
+def parse_chunk(path, start, end, fields):
+    """
+    Parses one byte range of a CSV file and returns its rows as
+    tuples of the columns at the given field positions.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    rows = []
+    for row in csv.reader(io.StringIO(text)):
+        if row:
+            rows.append(tuple(row[i] for i in fields))
+    return rows
+
+
+def parse_records(path, start, end, fields):
+    """
+    Parses one byte range of people.csv or movies.csv and returns its
+    ids as a list and its two other columns as StringTables.
+    """
+    rows = parse_chunk(path, start, end, fields)
+    ids, firsts, seconds = zip(*rows) if rows else ((), (), ())
+    return list(ids), StringTable.pack(firsts), StringTable.pack(seconds)
+
+
+def init_credits(person_index, movie_index):
+    """
+    Initializer for stars.csv workers. Forked workers already share
+    the maps with the parent.
+    """
+    global indexes
+    indexes = (person_index, movie_index)
+
+
+def parse_credits(path, start, end, fields):
+    """
+    Parses one byte range of stars.csv and returns arrays of the person
+    and movie numbers of its credits, dropping credits for unknown
+    people or movies.
+    """
+    person_index, movie_index = indexes
+    credit_people = array("i")
+    credit_movies = array("i")
+    for person_id, movie_id in parse_chunk(path, start, end, fields):
+        p = person_index.get(person_id)
+        m = movie_index.get(movie_id)
+        if p is not None and m is not None:
+            credit_people.append(p)
+            credit_movies.append(m)
+    return credit_people, credit_movies
+
+
+def merge_records(chunks):
+    """
+    Joins parsed people.csv or movies.csv chunks in file order. Returns
+    the id -> number map, the ids and the two other columns, keeping
+    the first record for duplicated ids as Graph.from_rows does.
+    """
+    ids = [row_id for row_ids, _, _ in chunks for row_id in row_ids]
+    index = dict(zip(ids, range(len(ids))))
+    firsts = StringTable.concat([first for _, first, _ in chunks])
+    seconds = StringTable.concat([second for _, _, second in chunks])
+    if len(index) < len(ids):
+        # Rare: decode the columns again to drop the later duplicates
+        index = {}
+        ids, firsts, seconds = intern_rows(zip(ids, firsts, seconds), index)
+    return index, ids, firsts, seconds
+
+
+def load_graph(directory, workers=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Loads a data directory into a Graph, parsing the CSV files
+    concurrently in chunks: people.csv and movies.csv together,
+    then stars.csv.
+
+    progress, if given, is called as progress(filename, done, total)
+    with byte counts after every parsed chunk. Returns the graph and a
+    dict of load statistics.
+    """
+    started = time.perf_counter()
+    jobs = {}
+    totals = {}
+    for filename, columns in COLUMNS.items():
+        path = os.path.join(directory, filename)
+        header, chunks = split_chunks(path, chunk_size)
+        try:
+            fields = [header.index(column) for column in columns]
+        except ValueError:
+            raise ValueError(f"{filename} must have columns {columns}")
+        totals[filename] = sum(end - start for start, end in chunks)
+        jobs[filename] = [(path, start, end, fields) for start, end in chunks]
+
+    results = {filename: {} for filename in COLUMNS}
+    done = {filename: 0 for filename in COLUMNS}
+
+    def run(executor, parse, filenames):
+        futures = {
+            executor.submit(parse, *job): (filename, i, job[2] - job[1])
+            for filename in filenames
+            for i, job in enumerate(jobs[filename])
+        }
+        for future in as_completed(futures):
+            filename, i, size = futures[future]
+            results[filename][i] = future.result()
+            done[filename] += size
+            if progress is not None:
+                progress(filename, done[filename], totals[filename])
+
+    def in_order(filename):
+        return [results[filename][i] for i in sorted(results[filename])]
+
+    with ProcessPoolExecutor(workers) as executor:
+        run(executor, parse_records, ["people.csv", "movies.csv"])
+    parsed = time.perf_counter()
+    person_index, person_ids, person_names, person_births = merge_records(
+        in_order("people.csv")
+    )
+    movie_index, movie_ids, movie_titles, movie_years = merge_records(
+        in_order("movies.csv")
+    )
+    merged = time.perf_counter()
+
+    with ProcessPoolExecutor(workers, initializer=init_credits,
+                             initargs=(person_index, movie_index)) as executor:
+        run(executor, parse_credits, ["stars.csv"])
+    credits_parsed = time.perf_counter()
+    credit_people = array("i")
+    credit_movies = array("i")
+    for people, movies in in_order("stars.csv"):
+        credit_people.extend(people)
+        credit_movies.extend(movies)
+
+    graph = Graph.packed(person_ids, person_names, person_births,
+                         movie_ids, movie_titles, movie_years,
+                         *build_csr(len(person_ids), len(movie_ids),
+                                    credit_people, credit_movies))
+    finished = time.perf_counter()
+
+    stats = {
+        "parse_seconds": round(parsed - started + credits_parsed - merged, 3),
+        "merge_seconds": round(merged - parsed + finished - credits_parsed, 3),
+        "rows": {
+            "people.csv": len(person_ids),
+            "movies.csv": len(movie_ids),
+            "stars.csv": len(credit_people),
+        },
+        "chunks": sum(map(len, jobs.values())),
+    }
+    stats.update(peak_memory())
+    return graph, stats
+
+
+def peak_memory():
+    """
+    Returns the peak resident set size of this process and of its
+    finished worker processes, in kilobytes.
+    """
+    if resource is None:
+        return {}
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    scale = 1024 if sys.platform == "darwin" else 1
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "peak_rss_kb": own // scale,
+        "peak_rss_workers_kb": children // scale,
+    }
+
+
+def print_progress(filename, done, total):
+    percent = 100 * done / total if total else 100
+    print(f"  {filename}: {percent:.0f}%", file=sys.stderr)
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python ingest.py directory [workers]")
+    directory = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else None
+
+    print("Loading data...")
+    graph, stats = load_graph(directory, workers, progress=print_progress)
+    print(f"Loaded {graph.person_count()} people and "
+          f"{graph.movie_count()} movies.")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
+
+    # Compile the snapshot so later degrees runs start instantly
+    path = os.path.join(directory, snapshot.SNAPSHOT_NAME)
+    snapshot.save(graph, path, snapshot.source_stats(directory))
+    print(f"Snapshot written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Name index for degrees lookups.
+
+Distinct lowercase names are kept sorted, so prefix completion is a
+binary search plus a short scan. A padded trigram inverted index picks
+fuzzy-match candidates, which are filtered with the q-gram count lemma
+and then verified with a bounded edit distance.
+
+Names are numbered by length, so the names of lengths within reach of
+a query are one slice of every posting list. Only the rarest lists are
+counted, since a match must appear in some of them, and at most
+CANDIDATE_LIMIT candidates, those sharing the most n-grams, are
+verified. A query made only of common n-grams can therefore miss a
+match; on 300,000 synthetic names a typo takes about 1 ms at the median
+and under 10 ms at worst.
+"""
+import heapq
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+# Length of the n-grams used for fuzzy candidates
+GRAM = 3
+
+PAD = "\0" * (GRAM - 1)
+
+# Posting entries to count per fuzzy query beyond the minimum needed
+SCAN_LIMIT = 5000
+
+# Candidates to verify per fuzzy query, those sharing the most n-grams
+CANDIDATE_LIMIT = 100
+
+
+class NameIndex():
+    def __init__(self, names):
+        # Distinct lowercase names in sorted order
+        self.names = sorted(set(name.lower() for name in names))
+        # The same names ordered by length, which fuzzy matches number
+        # them by, and their lengths
+        self.by_length = sorted(self.names, key=len)
+        self.lengths = array("i", map(len, self.by_length))
+        # Maps each n-gram to the numbers of the names containing it,
+        # in increasing order, so names of given lengths form one slice
+        self.grams = {}
+        for i, name in enumerate(self.by_length):
+            for gram in set(grams(name)):
+                postings = self.grams.get(gram)
+                if postings is None:
+                    postings = self.grams[gram] = array("i")
+                postings.append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns up to limit names starting with prefix, in sorted order.
+        """
+        prefix = prefix.lower()
+        i = bisect_left(self.names, prefix)
+        matches = []
+        while (i < len(self.names) and len(matches) < limit
+               and self.names[i].startswith(prefix)):
+            matches.append(self.names[i])
+            i += 1
+        return matches
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to limit (distance, name) pairs for names within
+        max_distance edits of name, closest first.
+        """
+        name = name.lower()
+        query = set(grams(name))
+        # Each edit destroys at most GRAM of the query's n-grams
+        threshold = len(query) - GRAM * max_distance
+        # Numbers of the names within max_distance of the query's length
+        low = bisect_left(self.lengths, len(name) - max_distance)
+        high = bisect_left(self.lengths, len(name) + max_distance + 1)
+
+        if threshold > 0:
+            postings = []
+            for gram in query:
+                ids = self.grams.get(gram, ())
+                postings.append(
+                    ids[bisect_left(ids, low):bisect_left(ids, high)]
+                )
+            postings.sort(key=len)
+            # A match shares threshold n-grams with the query, so it is
+            # in one of the rarest len(query) - threshold + 1 lists, and
+            # in one more for each further list counted
+            scanned = len(query) - threshold + 1
+            total = sum(map(len, postings[:scanned]))
+            while (scanned < len(postings)
+                   and total + len(postings[scanned]) <= SCAN_LIMIT):
+                total += len(postings[scanned])
+                scanned += 1
+            needed = threshold - (len(postings) - scanned)
+            counts = Counter(chain.from_iterable(postings[:scanned]))
+            candidates = [i for i, count in counts.items()
+                          if count >= needed]
+            if len(candidates) > CANDIDATE_LIMIT:
+                candidates = heapq.nlargest(CANDIDATE_LIMIT, candidates,
+                                            key=counts.__getitem__)
+        else:
+            # Too short to filter on n-grams, scan names of similar length
+            candidates = range(low, high)
+
+        matches = []
+        for i in candidates:
+            candidate = self.by_length[i]
+            # The full count lemma is much cheaper than the edit distance
+            if (threshold > 0
+                    and len(query.intersection(grams(candidate))) < threshold):
+                continue
+            distance = bounded_distance(name, candidate, max_distance)
+            if distance is not None:
+                matches.append((distance, candidate))
+        matches.sort()
+        return matches[:limit]
+
+    def memory_bytes(self):
+        """
+        Returns the approximate memory used by the index, in bytes,
+        including the name strings themselves.
+        """
+        size = sys.getsizeof(self.names) + sys.getsizeof(self.grams)
+        size += sum(sys.getsizeof(name) for name in self.names)
+        for gram, postings in self.grams.items():
+            size += sys.getsizeof(gram) + sys.getsizeof(postings)
+        size += sys.getsizeof(self.by_length) + sys.getsizeof(self.lengths)
+        return size
+
+
+def grams(name):
+    """
+    Returns the padded n-grams of a name, one per character
+    plus GRAM - 1 for the padding.
+    """
+    padded = PAD + name + PAD
+    return [padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)]
+
+
+def bounded_distance(a, b, bound):
+    """
+    Returns the Levenshtein distance between a and b,
+    or None if it is larger than bound.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return None
+    # A shared prefix or suffix does not change the distance
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while (end < len(a) - start and end < len(b) - start
+           and a[-1 - end] == b[-1 - end]):
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+
+    # Only cells within bound of the diagonal can be within bound;
+    # the others are left at bound + 1
+    over = bound + 1
+    previous = [min(j, over) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        first = max(1, i - bound)
+        last = min(len(b), i + bound)
+        current = [over] * (len(b) + 1)
+        current[0] = min(i, over)
+        for j in range(first, last + 1):
+            current[j] = min(previous[j] + 1,
+                             current[j - 1] + 1,
+                             previous[j - 1] + (ca != b[j - 1]))
+        if min(current[first - 1:last + 1]) > bound:
+            return None
+        previous = current
+    distance = previous[-1]
+    return distance if distance <= bound else None
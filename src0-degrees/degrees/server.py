@@ -0,0 +1,477 @@
+"""
+Batch query server for degrees.
+
+Loads the dataset once and answers JSON-lines queries such as
+
+    {"id": 1, "source": "Kevin Bacon", "target": "Tom Hanks"}
+
+read from stdin or from a local Unix socket, writing one JSON response
+per line. Searches run in a pool of worker processes that inherit the
+loaded graph, and recent paths are kept in an LRU cache.
+
+{"command": "stats"} reports cache counters and name index memory, and
+{"command": "update", "directory": "..."} applies delta CSV files.
+Requests that cannot be answered get a response with an "error" key.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import degrees
+
+
+# Returned by LRUCache.get for keys it does not hold
+MISSING = object()
+
+# Request fields that must be strings when given
+FIELDS = ["command", "directory", "search", "source", "source_id",
+          "target", "target_id"]
+
+
+class LRUCache():
+    """
+    Thread-safe least-recently-used cache with hit/miss counters.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def values(self):
+        with self.lock:
+            return list(self.entries.values())
+
+    def discard(self, keep):
+        """
+        Drops every entry for which keep(key, value) is false
+        and returns how many were dropped.
+        """
+        with self.lock:
+            stale = [key for key, value in self.entries.items()
+                     if not keep(key, value)]
+            for key in stale:
+                del self.entries[key]
+            return len(stale)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ReadWriteLock():
+    """
+    Lock held by any number of readers at once or by a single writer.
+    A waiting writer holds off new readers, so it is not starved.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+
+class QueryError(Exception):
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.details = details
+
+
+def load_store(directory, search):
+    """
+    Loads the store the given search runs on into the degrees module.
+    """
+    if search in degrees.GRAPH_SEARCHES:
+        degrees.load_graph(directory)
+    else:
+        degrees.load_data(directory)
+
+
+def init_worker(directory, search):
+    """
+    Pool initializer. Forked workers already share the parent's store;
+    spawned workers load their own copy.
+    """
+    if degrees.graph is None and not degrees.people:
+        load_store(directory, search)
+
+
+def run_search(search, source, target):
+    """
+    Runs one search in a worker and returns the path and its duration.
+    """
+    searches = {**degrees.SEARCHES, **degrees.GRAPH_SEARCHES}
+    start = time.perf_counter()
+    path = searches[search](source, target)
+    return path, time.perf_counter() - start
+
+
+class Server():
+    def __init__(self, directory, search="csr-movies", workers=None,
+                 cache_size=1024):
+        self.directory = directory
+        self.search = search
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = LRUCache(cache_size)
+        self.pool = None
+        # Queries read the loaded data and pool; updates replace them
+        self.lock = ReadWriteLock()
+
+    def start(self):
+        load_store(self.directory, self.search)
+        self.start_pool()
+
+    def start_pool(self):
+        # Load the landmark index here so forked workers share one copy
+        # and later updates repair it instead of each worker building it
+        if self.search == "alt" and degrees.landmark_index is None:
+            degrees.load_landmarks()
+        # Fork lets workers share the loaded graph instead of reloading it
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "fork" if "fork" in methods else None
+        )
+        self.pool = context.Pool(
+            self.workers, initializer=init_worker,
+            initargs=(self.directory, self.search)
+        )
+
+    def update(self, directory):
+        """
+        Applies a delta directory to the loaded data and drops only the
+        cached paths the new credits could shorten or connect. Waits for
+        queries in flight, so none uses the old pool or caches a path
+        found on the old data after the stale entries are dropped.
+        """
+        with self.lock.writing():
+            touched = degrees.apply_delta(directory)
+            # Workers hold a copy of the old data, replace them
+            old_pool = self.pool
+            self.start_pool()
+            old_pool.close()
+
+            if not touched:
+                return {"touched": 0, "invalidated": 0}
+            paths = self.cache.values()
+            lengths = [len(path) for path in paths if path is not None]
+            unbounded = any(path is None for path in paths)
+            radius = None if unbounded else max(lengths, default=0)
+            distances = degrees.distances_from(touched, radius)
+
+            def keep(key, path):
+                # A new credit links a touched person to every co-star of
+                # the movie, and those co-stars are not touched. A new
+                # path only has to pass through one touched person, so
+                # it is at least distances[source] + distances[target]
+                _, source, target = key
+                if source not in distances or target not in distances:
+                    return True
+                if path is None:
+                    return False
+                return distances[source] + distances[target] >= len(path)
+
+            invalidated = self.cache.discard(keep)
+            return {"touched": len(touched), "invalidated": invalidated}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def searches(self):
+        """
+        Returns the searches that run on the loaded store.
+        """
+        if self.search in degrees.GRAPH_SEARCHES:
+            return degrees.GRAPH_SEARCHES
+        return degrees.SEARCHES
+
+    def resolve(self, name, person_id=None):
+        """
+        Returns the IMDB id for a name, following person_id_for_name:
+        exact case-insensitive matches only, with ambiguities resolved
+        by an explicitly given person id.
+        """
+        person_ids = degrees.person_ids_for_name(name or "")
+        if person_id is not None and not person_ids:
+            try:
+                degrees.person_details(person_id)
+            except KeyError:
+                raise QueryError("person not found", id=person_id)
+            return person_id
+        if len(person_ids) == 0:
+            raise QueryError("person not found", name=name,
+                             suggestions=degrees.suggest_names(name or ""))
+        if len(person_ids) > 1:
+            if person_id in person_ids:
+                return person_id
+            candidates = []
+            for candidate in person_ids:
+                candidate_name, birth = degrees.person_details(candidate)
+                candidates.append(
+                    {"id": candidate, "name": candidate_name, "birth": birth}
+                )
+            raise QueryError("ambiguous name", name=name,
+                             candidates=candidates)
+        return person_ids[0]
+
+    def handle(self, line):
+        """
+        Answers one JSON-lines request and returns the response dict.
+        Never raises: any failure becomes an error response, so one bad
+        request cannot end a stream or connection.
+        """
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"error": f"invalid json: {e}"}
+        if not isinstance(request, dict):
+            return {"error": "request must be a json object"}
+
+        response = {"id": request.get("id")}
+        try:
+            self.answer(request, response, start)
+        except QueryError as e:
+            response["error"] = str(e)
+            response.update(e.details)
+        except Exception as e:
+            response["error"] = f"internal error: {e!r}"
+        return response
+
+    def answer(self, request, response, start):
+        """
+        Fills in the response to a parsed request. Raises QueryError
+        for requests that cannot be answered.
+        """
+        for field in FIELDS:
+            value = request.get(field)
+            if value is not None and not isinstance(value, str):
+                raise QueryError("field must be a string", field=field,
+                                 value=value)
+
+        if request.get("command") == "stats":
+            response["cache"] = self.cache.stats()
+            response["workers"] = self.workers
+            # Built by the first unknown name, in this process
+            if degrees.name_index is not None:
+                response["name_index_bytes"] = (
+                    degrees.name_index.memory_bytes()
+                )
+            return
+        if request.get("command") == "update":
+            try:
+                response.update(self.update(request["directory"]))
+            except (KeyError, OSError) as e:
+                response["error"] = f"update failed: {e}"
+            return
+        if request.get("command") is not None:
+            raise QueryError("unknown command", command=request["command"],
+                             choices=["stats", "update"])
+
+        with self.lock.reading():
+            self.answer_query(request, response, start)
+
+    def answer_query(self, request, response, start):
+        """
+        Answers a path query. Called with the lock held for reading.
+        """
+        search = request.get("search", self.search)
+        if search not in self.searches():
+            raise QueryError("unknown search", search=search,
+                             choices=list(self.searches()))
+        source = self.resolve(request.get("source"), request.get("source_id"))
+        target = self.resolve(request.get("target"), request.get("target_id"))
+
+        key = (search, source, target)
+        cached = self.cache.get(key)
+        if cached is MISSING:
+            path, seconds = self.pool.apply(run_search, key)
+            self.cache.put(key, path)
+            response["cached"] = False
+            response["search_ms"] = round(seconds * 1000, 3)
+        else:
+            path = cached
+            response["cached"] = True
+
+        response["source"] = source
+        response["target"] = target
+        response.update(describe(source, path))
+        response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def serve_stream(self, lines, output):
+        """
+        Answers every non-blank line concurrently, writing responses
+        in request order. Update commands wait for the queries before
+        them, so those are answered from the data they were sent against.
+        """
+        def write(response):
+            output.write(json.dumps(response) + "\n")
+            output.flush()
+
+        pending = deque()
+        with ThreadPoolExecutor(self.workers) as executor:
+            for line in lines:
+                if not line.strip():
+                    continue
+                if is_update(line):
+                    while pending:
+                        write(pending.popleft().result())
+                    write(self.handle(line))
+                    continue
+                pending.append(executor.submit(self.handle, line))
+                while pending and pending[0].done():
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+
+    def serve_socket(self, path):
+        """
+        Answers JSON-lines requests on a Unix socket, one thread
+        per connection.
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = server.handle(line)
+                    self.wfile.write((json.dumps(response) + "\n").encode())
+
+        if os.path.exists(path):
+            os.remove(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as unix:
+            unix.daemon_threads = True
+            try:
+                unix.serve_forever()
+            finally:
+                os.remove(path)
+
+
+def is_update(line):
+    """
+    Returns whether a request line is an update command.
+    """
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(request, dict) and request.get("command") == "update"
+
+
+def describe(source, path):
+    """
+    Returns the degrees and named steps of a path for a response.
+    """
+    if path is None:
+        return {"degrees": None, "path": None}
+    steps = []
+    for movie_id, person_id in path:
+        name, _ = degrees.person_details(person_id)
+        steps.append({
+            "movie": movie_id,
+            "title": degrees.movie_title(movie_id),
+            "person": person_id,
+            "name": name,
+        })
+    return {"degrees": len(path), "path": steps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch degrees query server")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", default="csr-movies",
+                        choices=[*degrees.SEARCHES, *degrees.GRAPH_SEARCHES])
+    parser.add_argument("--socket", help="serve on this Unix socket path")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", type=int, default=1024,
+                        help="number of recent paths to cache")
+    args = parser.parse_args()
+
+    server = Server(args.directory, args.search, args.workers, args.cache)
+    print("Loading data...", file=sys.stderr)
+    server.start()
+    print("Data loaded.", file=sys.stderr)
+    try:
+        if args.socket:
+            server.serve_socket(args.socket)
+        else:
+            server.serve_stream(sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
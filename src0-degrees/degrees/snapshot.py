@@ -0,0 +1,196 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import Graph, SortedIndex, StringTable, sorted_order
+
+# Name of the compiled snapshot written next to the CSV files
+SNAPSHOT_NAME = "degrees.snapshot"
+
+# CSV files whose mtime and size decide whether a snapshot is still valid
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+MAGIC = b"DEGSNAP\x01"
+
+# Graph columns holding strings and int32 arrays
+STRING_COLUMNS = ("person_ids", "person_names", "person_births",
+                  "movie_ids", "movie_titles", "movie_years")
+INT_COLUMNS = ("person_offsets", "person_movies",
+               "movie_offsets", "movie_stars")
+
+# Header keys and sections every snapshot has
+HEADER_KEYS = {"byteorder", "sources", "sections"}
+SECTIONS = {
+    *(f"{name}.{part}" for name in STRING_COLUMNS
+      for part in ("offsets", "data")),
+    *INT_COLUMNS,
+    "person_id_order", "movie_id_order", "name_order",
+}
+
+
+def load(directory, build=Graph.from_csv):
+    """
+    Returns the graph for a data directory, mapping the compiled
+    snapshot if it is still fresh and calling build(directory) to
+    rebuild it from CSV otherwise.
+    """
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    sources = source_stats(directory)
+    try:
+        return open_snapshot(path, sources)
+    except (OSError, ValueError):
+        pass
+
+    graph = build(directory)
+    try:
+        save(graph, path, sources)
+    except OSError:
+        # A read-only data directory just means no snapshot
+        pass
+    return graph
+
+
+def source_stats(directory):
+    """
+    Returns the mtime and size of every CSV file in a data directory.
+    """
+    stats = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stats[name] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def save(graph, path, sources):
+    """
+    Writes a graph to a snapshot file, tagging it with the CSV stats
+    it was built from. The file is replaced atomically.
+    """
+    sections = {}
+    for name in STRING_COLUMNS:
+        column = getattr(graph, name)
+        if not isinstance(column, StringTable):
+            column = StringTable.pack(column)
+        sections[f"{name}.offsets"] = array("q", column.offsets)
+        sections[f"{name}.data"] = array("B", column.data)
+    for name in INT_COLUMNS:
+        sections[name] = array("i", getattr(graph, name))
+
+    # Orderings that let lookups binary search instead of building dicts
+    sections["person_id_order"] = index_order(graph.person_index,
+                                              graph.person_ids)
+    sections["movie_id_order"] = index_order(graph.movie_index,
+                                             graph.movie_ids)
+    sections["name_order"] = index_order(graph.names, graph.person_names,
+                                         lower=True)
+
+    # Lay sections out after the header, each aligned to 8 bytes
+    layout = {}
+    position = 0
+    for name, values in sections.items():
+        size = len(values) * values.itemsize
+        layout[name] = [position, size, values.typecode]
+        position += size + (-size % 8)
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "sources": sources,
+        "sections": layout,
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for name, values in sections.items():
+                size = len(values) * values.itemsize
+                f.write(values.tobytes())
+                f.write(b"\0" * (-size % 8))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def index_order(index, column, lower=False):
+    """
+    Returns the row order of a SortedIndex, or sorts the rows of
+    column for a graph built with dicts.
+    """
+    if isinstance(index, SortedIndex):
+        return array("i", index.order)
+    if lower:
+        column = [value.lower() for value in column]
+    return sorted_order(column)
+
+
+def open_snapshot(path, sources=None):
+    """
+    Maps a snapshot file into memory and returns a graph whose
+    columns are views over the mapped pages.
+
+    Raises ValueError if the file is not a snapshot, is truncated or
+    corrupt, was written on a machine with another byte order, or does
+    not match the given sources.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    start = len(MAGIC) + 8
+    if len(mapped) < start or mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a degrees snapshot")
+    (length,) = struct.unpack("<Q", mapped[len(MAGIC):start])
+    if start + length > len(mapped):
+        raise ValueError("truncated snapshot header")
+    try:
+        header = json.loads(bytes(mapped[start:start + length]))
+    except ValueError:
+        raise ValueError("corrupt snapshot header")
+    if not isinstance(header, dict) or not HEADER_KEYS <= header.keys():
+        raise ValueError("corrupt snapshot header")
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError("snapshot written with another byte order")
+    if sources is not None and header["sources"] != sources:
+        raise ValueError("snapshot is stale")
+
+    body = start + length
+    sections = header["sections"]
+    if not isinstance(sections, dict) or not SECTIONS <= sections.keys():
+        raise ValueError("snapshot is missing sections")
+    buffer = memoryview(mapped)
+    views = {}
+    for name, section in sections.items():
+        try:
+            offset, size, typecode = section
+            itemsize = array(typecode).itemsize
+        except (TypeError, ValueError):
+            raise ValueError(f"corrupt snapshot section {name}")
+        if (not isinstance(offset, int) or not isinstance(size, int)
+                or offset < 0 or size < 0 or size % itemsize
+                or body + offset + size > len(mapped)):
+            raise ValueError(f"snapshot section {name} out of bounds")
+        try:
+            views[name] = buffer[body + offset:body + offset + size].cast(
+                typecode
+            )
+        except (TypeError, ValueError):
+            raise ValueError(f"corrupt snapshot section {name}")
+
+    columns = {
+        name: StringTable(views[f"{name}.offsets"], views[f"{name}.data"])
+        for name in STRING_COLUMNS
+    }
+    columns.update({name: views[name] for name in INT_COLUMNS})
+    return Graph(
+        **columns,
+        person_index=SortedIndex(columns["person_ids"],
+                                 views["person_id_order"]),
+        movie_index=SortedIndex(columns["movie_ids"],
+                                views["movie_id_order"]),
+        names=SortedIndex(columns["person_names"], views["name_order"],
+                          lower=True, unique=False),
+    )
@@ -0,0 +1,125 @@
+"""
+Synthetic dataset generator for degrees.
+
+Writes people.csv, movies.csv and stars.csv with the same columns as
+the IMDB exports. Cast sizes follow a heavy-tailed distribution and
+people are cast with Zipf-like popularity, so a few prolific actors
+link most of the graph, as in the real data. Names are drawn from
+small pools so some of them repeat, like real namesakes.
+"""
+import csv
+import os
+import random
+import sys
+from bisect import bisect_right
+from itertools import accumulate
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael",
+    "Linda", "William", "Elizabeth", "David", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Emma",
+    "Kevin", "Tom", "Meryl", "Denzel", "Cate", "Keanu", "Viola", "Hugh",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+]
+TITLE_WORDS = [
+    "Night", "Return", "Last", "City", "Love", "Dark", "Secret", "Road",
+    "King", "Star", "Lost", "River", "Fire", "Dream", "War", "Summer",
+    "Shadow", "Game", "Heart", "Island", "Storm", "Ghost", "Silver",
+]
+
+# Average credits per movie and per person
+CAST_SIZE = 4
+CREDITS_PER_PERSON = 3
+
+# Largest cast a movie can have
+MAX_CAST = 200
+
+# Zipf exponent of person popularity
+POPULARITY = 1.1
+
+
+def generate(directory, credits, seed=0):
+    """
+    Writes a synthetic dataset with about the given number of
+    credits into directory and returns (people, movies, credits)
+    counts actually written.
+    """
+    rng = random.Random(seed)
+    people = max(2, credits // CREDITS_PER_PERSON)
+    movies = max(1, credits // CAST_SIZE)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["id", "name", "birth"])
+        for p in range(people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if rng.random() < 0.5:
+                # Rarer suffixes keep most names distinct
+                name += f" {rng.randrange(people)}"
+            birth = rng.randint(1900, 2010) if rng.random() < 0.8 else ""
+            writer.writerow([person_id(p), name, birth])
+
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["id", "title", "year"])
+        for m in range(movies):
+            words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+            writer.writerow([movie_id(m), " ".join(words),
+                             rng.randint(1920, 2025)])
+
+    # Popularity rank is shuffled so ids do not reveal prolific people
+    ranks = list(range(people))
+    rng.shuffle(ranks)
+    weights = list(accumulate(1 / (rank + 1) ** POPULARITY for rank in ranks))
+    total = weights[-1]
+
+    written = 0
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for m in range(movies):
+            # Pareto cast sizes with mean close to CAST_SIZE
+            size = int(rng.paretovariate(1.5) * 1.4)
+            size = max(1, min(size, MAX_CAST, people))
+            cast = set()
+            while len(cast) < size:
+                p = bisect_right(weights, rng.random() * total)
+                cast.add(min(p, people - 1))
+            for p in cast:
+                writer.writerow([person_id(p), movie_id(m)])
+            written += len(cast)
+
+    return people, movies, written
+
+
+def person_id(p):
+    return 100 + p
+
+
+def movie_id(m):
+    return 1000000 + m
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python synthetic.py directory credits [seed]")
+    directory = sys.argv[1]
+    credits = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else 0
+    people, movies, written = generate(directory, credits, seed)
+    print(f"Wrote {people} people, {movies} movies and "
+          f"{written} credits to {directory}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Vectorized Tic Tac Toe board evaluation with NumPy.
+
+Boards come as an (N, 3, 3) integer array with 0 for empty, 1 for X and
+2 for O. Each board is folded into a pair of 9-bit masks, cell (i, j) at
+bit 3 * i + j as in bitboard, and wins are looked up in a 512-entry
+table, so a whole batch is a handful of array operations.
+"""
+import numpy as np
+
+import bitboard
+from tictactoe import X, O
+
+EMPTY_CODE = 0
+X_CODE = 1
+O_CODE = 2
+
+# Bit value of every cell, in row-major order
+BITS = (1 << np.arange(9)).astype(np.int16)
+
+# WINS[mask] is True when the cells in mask contain a full line
+WINS = np.array(bitboard.WINS, dtype=bool)
+
+
+def encode(boards):
+    """
+    Returns the (N, 3, 3) int8 array of a sequence of list-of-lists
+    boards.
+    """
+    codes = {X: X_CODE, O: O_CODE}
+    return np.array(
+        [[[codes.get(cell, EMPTY_CODE) for cell in row] for row in board]
+         for board in boards],
+        dtype=np.int8,
+    ).reshape(-1, 3, 3)
+
+
+def masks(boards):
+    """
+    Returns the (x, o) int16 mask arrays of an (N, 3, 3) array of boards.
+    """
+    boards = np.asarray(boards)
+    if boards.ndim != 3 or boards.shape[1:] != (3, 3):
+        raise ValueError(f"expected boards of shape (N, 3, 3), "
+                         f"got {boards.shape}")
+    cells = boards.reshape(-1, 9)
+    x = (cells == X_CODE) @ BITS
+    o = (cells == O_CODE) @ BITS
+    return x, o
+
+
+def evaluate(boards):
+    """
+    Returns (winners, terminal, to_move, legal) for an (N, 3, 3) array
+    of boards:
+        winners: int8 X_CODE, O_CODE or EMPTY_CODE for no winner
+        terminal: bool, True if the game is over
+        to_move: int8 X_CODE or O_CODE, the side to move as in player
+        legal: (N, 3, 3) bool, the empty cells of unfinished games
+    """
+    x, o = masks(boards)
+    x_wins = WINS[x]
+    o_wins = WINS[o]
+    winners = np.where(x_wins, X_CODE,
+                       np.where(o_wins, O_CODE, EMPTY_CODE)).astype(np.int8)
+    terminal = x_wins | o_wins | ((x | o) == bitboard.FULL)
+
+    cells = np.asarray(boards).reshape(-1, 9)
+    x_count = np.count_nonzero(cells == X_CODE, axis=1)
+    o_count = np.count_nonzero(cells == O_CODE, axis=1)
+    to_move = np.where(x_count == o_count, X_CODE, O_CODE).astype(np.int8)
+
+    legal = (cells == EMPTY_CODE) & ~terminal[:, None]
+    return winners, terminal, to_move, legal.reshape(-1, 3, 3)
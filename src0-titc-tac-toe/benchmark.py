@@ -0,0 +1,153 @@
+"""
+Headless benchmark for the tictactoe searches.
+
+Plays games for every strategy in tictactoe.SEARCHES, either against
+itself or against a random opponent, and reports nodes searched,
+nodes/sec, per-move latency percentiles and game outcomes as JSON.
+
+    python benchmark.py --games 50 --mode random
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import bitboard
+import perfect_play
+import symmetry
+import tictactoe as ttt
+
+MODES = ("self", "random")
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def milliseconds(seconds):
+    """
+    Returns a duration in seconds as rounded milliseconds, or None
+    when there is no duration to report.
+    """
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def reset_caches():
+    """
+    Empties the searches' tables so every strategy starts cold.
+    """
+    ttt.table.clear()
+    bitboard.table.clear()
+    symmetry.cache.clear()
+    perfect_play.table = None
+
+
+def play_game(search, mode, ai, rng, opening):
+    """
+    Plays one game and returns (winner, latencies, nodes) for the AI's
+    moves. In random mode the AI plays side ai; in self mode it plays
+    both sides after opening random moves.
+    """
+    board = ttt.initial_state()
+    latencies = []
+    nodes = []
+    turn = 0
+    while not ttt.terminal(board):
+        if (mode == "random" and ttt.player(board) != ai) or (
+                mode == "self" and turn < opening):
+            action = rng.choice(sorted(ttt.actions(board)))
+        else:
+            start = time.perf_counter()
+            action = ttt.minimax(board, search)
+            latencies.append(time.perf_counter() - start)
+            nodes.append(ttt.nodes)
+        board = ttt.result(board, action)
+        turn += 1
+    return ttt.winner(board), latencies, nodes
+
+
+def bench_search(search, mode, games, seed, opening):
+    reset_caches()
+    rng = random.Random(seed)
+    latencies = []
+    nodes = []
+    outcomes = {}
+    for game in range(games):
+        ai = ttt.X if game % 2 == 0 else ttt.O
+        winner, game_latencies, game_nodes = play_game(
+            search, mode, ai, rng, opening
+        )
+        latencies.extend(game_latencies)
+        nodes.extend(game_nodes)
+        if mode == "random":
+            outcome = ("draws" if winner is None
+                       else "wins" if winner == ai else "losses")
+        else:
+            outcome = "draws" if winner is None else f"{winner.lower()}_wins"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    seconds = sum(latencies)
+    return {
+        "games": games,
+        "moves": len(latencies),
+        "outcomes": outcomes,
+        "nodes": sum(nodes),
+        "mean_nodes": round(sum(nodes) / len(nodes), 1) if nodes else 0,
+        "nodes_per_second": round(sum(nodes) / seconds) if seconds else None,
+        # None when no move was searched, e.g. with --opening 9
+        "p50_ms": milliseconds(percentile(latencies, 0.50)),
+        "p90_ms": milliseconds(percentile(latencies, 0.90)),
+        "p99_ms": milliseconds(percentile(latencies, 0.99)),
+        "max_ms": milliseconds(max(latencies, default=None)),
+        "mean_ms": milliseconds(seconds / len(latencies) if latencies
+                                else None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tictactoe searches")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--mode", choices=MODES, default="random")
+    parser.add_argument("--opening", type=int, default=1,
+                        help="random moves that open each self-play game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--searches", nargs="+", default=list(ttt.SEARCHES),
+                        choices=list(ttt.SEARCHES))
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "mode": args.mode,
+        "games": args.games,
+        "seed": args.seed,
+        "searches": {},
+    }
+    for search in args.searches:
+        print(f"Benchmarking {search}...", file=sys.stderr)
+        report["searches"][search] = bench_search(
+            search, args.mode, args.games, args.seed, args.opening
+        )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(json.dumps(report["searches"], indent=2))
+    print(f"Results written to {args.output}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Bitboard Tic Tac Toe engine.
+
+A position is a pair of 9-bit masks (x, o), with cell (i, j) at bit
+3 * i + j. Moves, legal moves, side to move and wins are all a few
+bit operations. The list-of-lists functions below wrap the same API
+as tictactoe, so `import bitboard as ttt` works in runner.py.
+"""
+import math
+
+from tictactoe import X, O, EMPTY
+
+FULL = 0b111111111
+
+# Bit masks of the three-in-a-row lines
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# WINS[mask] is True when the cells in mask contain a full line
+WINS = [any(mask & line == line for line in LINES) for mask in range(1 << 9)]
+
+# Center first, then corners, then edges
+MOVE_ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+# Positions visited by the most recent minimax call
+nodes = 0
+
+# Transposition table: (x, o) -> (value, bound, best move)
+table = {}
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+def encode(board):
+    """
+    Returns the (x, o) masks of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(x, o):
+    """
+    Returns the list-of-lists board of (x, o) masks.
+    """
+    board = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            bit = 1 << (3 * i + j)
+            row.append(X if x & bit else O if o & bit else EMPTY)
+        board.append(row)
+    return board
+
+
+def to_move(x, o):
+    """
+    Returns True if X moves next.
+    """
+    return x.bit_count() == o.bit_count()
+
+
+def legal_moves(x, o):
+    """
+    Returns the mask of empty cells.
+    """
+    return ~(x | o) & FULL
+
+
+def play(x, o, move):
+    """
+    Returns the masks after the side to move takes bit number move.
+    """
+    bit = 1 << move
+    if (x | o) & bit:
+        raise Exception("this action is not allowed")
+    if to_move(x, o):
+        return x | bit, o
+    return x, o | bit
+
+
+def won(x, o):
+    """
+    Returns X or O if that side has a line, None otherwise.
+    """
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def over(x, o):
+    return WINS[x] or WINS[o] or (x | o) == FULL
+
+
+def score(x, o):
+    return 1 if WINS[x] else -1 if WINS[o] else 0
+
+
+def initial_state():
+    return decode(0, 0)
+
+
+def player(board):
+    return X if to_move(*encode(board)) else O
+
+
+def actions(board):
+    empty = legal_moves(*encode(board))
+    return {divmod(move, 3) for move in range(9) if empty >> move & 1}
+
+
+def result(board, action):
+    row, column = action
+    if row < 0 or column < 0 or row > 2 or column > 2:
+        raise Exception("this action is not allowed")
+    return decode(*play(*encode(board), 3 * row + column))
+
+
+def winner(board):
+    return won(*encode(board))
+
+
+def terminal(board):
+    return over(*encode(board))
+
+
+def utility(board):
+    return score(*encode(board))
+
+
+def minimax(board):
+    """
+    Returns the optimal action (i, j) for the current player.
+    """
+    global nodes
+    nodes = 0
+    x, o = encode(board)
+    if over(x, o):
+        return None
+    _, move = search(x, o, -math.inf, math.inf)
+    return divmod(move, 3)
+
+
+def search(x, o, alpha, beta):
+    """
+    Returns (value, move) for masks x and o by alpha-beta search with
+    the transposition table; value is exact when it lies strictly
+    between alpha and beta and a bound on it otherwise.
+    """
+    global nodes
+    nodes += 1
+
+    key = (x, o)
+    entry = table.get(key)
+    hint = None
+    if entry is not None:
+        value, bound, hint = entry
+        if (bound == EXACT
+                or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)):
+            return value, hint
+
+    if over(x, o):
+        value = score(x, o)
+        table[key] = (value, EXACT, None)
+        return value, None
+
+    maximizing = to_move(x, o)
+    empty = legal_moves(x, o)
+    moves = [move for move in MOVE_ORDER if empty >> move & 1]
+    if hint in moves:
+        moves.remove(hint)
+        moves.insert(0, hint)
+
+    original_alpha, original_beta = alpha, beta
+    value = -math.inf if maximizing else math.inf
+    best = None
+    for move in moves:
+        bit = 1 << move
+        if maximizing:
+            child, _ = search(x | bit, o, alpha, beta)
+            if child > value:
+                value, best = child, move
+                alpha = max(alpha, value)
+        else:
+            child, _ = search(x, o | bit, alpha, beta)
+            if child < value:
+                value, best = child, move
+                beta = min(beta, value)
+        if alpha >= beta:
+            break
+
+    if value <= original_alpha:
+        bound = UPPER
+    elif value >= original_beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    table[key] = (value, bound, best)
+    return value, best
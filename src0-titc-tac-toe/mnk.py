@@ -0,0 +1,343 @@
+"""
+Generalized m,n,k-game engine (Tic Tac Toe is 3,3,3, gomoku 15,15,5).
+
+The board tracks, for every line segment of k cells ("window"), how many
+X and O stones it holds. Playing or undoing a move only touches the
+windows through that cell, which keeps win detection, the heuristic
+evaluation and the Zobrist hash incremental. The AI runs iterative
+deepening negamax with alpha-beta and a transposition table, and
+returns the best move of the deepest search finished within its
+wall-clock budget.
+"""
+import random
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a win; faster wins score higher
+WIN = 1_000_000
+
+# Budget, in seconds, for one AI move
+BUDGET = 1.0
+
+# Boards with at most this many cells consider every empty cell
+SMALL_BOARD = 25
+
+# Board geometry shared by boards of the same shape
+shapes = {}
+
+# Positions searched by the most recent minimax call
+nodes = 0
+
+
+class Timeout(Exception):
+    pass
+
+
+def shape(rows, columns, k):
+    """
+    Returns (windows, cell_windows, weights, zobrist) for a board shape,
+    computing it on first use.
+    """
+    key = (rows, columns, k)
+    if key not in shapes:
+        windows = []
+        for i in range(rows):
+            for j in range(columns):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < columns:
+                        windows.append(tuple(
+                            (i + di * step) * columns + j + dj * step
+                            for step in range(k)
+                        ))
+        cell_windows = [[] for _ in range(rows * columns)]
+        for w, window in enumerate(windows):
+            for cell in window:
+                cell_windows[cell].append(w)
+        # A window with c stones of one side only is worth 10^c to it
+        weights = [0] + [10 ** c for c in range(1, k + 1)]
+        rng = random.Random(rows * 10007 + columns * 101 + k)
+        zobrist = [(rng.getrandbits(64), rng.getrandbits(64))
+                   for _ in range(rows * columns)]
+        shapes[key] = (windows, cell_windows, weights, zobrist)
+    return shapes[key]
+
+
+class Board():
+    def __init__(self, rows=3, columns=3, k=3):
+        self.rows = rows
+        self.columns = columns
+        self.k = k
+        (self.windows, self.cell_windows,
+         self.weights, self.zobrist) = shape(rows, columns, k)
+        self.cells = [EMPTY] * (rows * columns)
+        # [X stones, O stones] in every window
+        self.counts = [[0, 0] for _ in self.windows]
+        # Moves played, with the winner before each one
+        self.history = []
+        self.winner = None
+        # Heuristic value from X's point of view
+        self.score = 0
+        self.hash = 0
+
+    @classmethod
+    def from_lists(cls, board, k=3):
+        """
+        Returns a Board holding a list-of-lists board.
+        """
+        new = cls(len(board), len(board[0]), k)
+        xs = [(i, j) for i, row in enumerate(board)
+              for j, cell in enumerate(row) if cell == X]
+        os = [(i, j) for i, row in enumerate(board)
+              for j, cell in enumerate(row) if cell == O]
+        if not 0 <= len(xs) - len(os) <= 1:
+            raise Exception("this board is not reachable")
+        # Replaying the stones in alternating order keeps the counts and
+        # turn right; the order among each side's stones does not matter
+        for turn in range(len(xs) + len(os)):
+            i, j = xs[turn // 2] if turn % 2 == 0 else os[turn // 2]
+            new.history.append((i * new.columns + j, new.winner))
+            new.cells[i * new.columns + j] = X if turn % 2 == 0 else O
+            new.update(i * new.columns + j, turn % 2, 1)
+        return new
+
+    def to_lists(self):
+        return [self.cells[i * self.columns:(i + 1) * self.columns]
+                for i in range(self.rows)]
+
+    def player(self):
+        return X if len(self.history) % 2 == 0 else O
+
+    def full(self):
+        return len(self.history) == len(self.cells)
+
+    def terminal(self):
+        return self.winner is not None or self.full()
+
+    def actions(self):
+        return {divmod(cell, self.columns)
+                for cell, value in enumerate(self.cells) if value is EMPTY}
+
+    def play(self, cell):
+        """
+        Places the side to move's stone on cell number cell.
+        """
+        if self.cells[cell] is not EMPTY or self.winner is not None:
+            raise Exception("this action is not allowed")
+        side = len(self.history) % 2
+        self.history.append((cell, self.winner))
+        self.cells[cell] = X if side == 0 else O
+        self.update(cell, side, 1)
+
+    def undo(self):
+        cell, winner = self.history.pop()
+        side = len(self.history) % 2
+        self.cells[cell] = EMPTY
+        self.update(cell, side, -1)
+        self.winner = winner
+
+    def update(self, cell, side, step):
+        """
+        Adds (step 1) or removes (step -1) a stone of side on cell in
+        the window counts, score, winner and hash.
+        """
+        weights = self.weights
+        for w in self.cell_windows[cell]:
+            counts = self.counts[w]
+            self.score -= window_value(counts, weights)
+            counts[side] += step
+            self.score += window_value(counts, weights)
+            if step > 0 and counts[side] == self.k:
+                self.winner = X if side == 0 else O
+        self.hash ^= self.zobrist[cell][side]
+
+    def evaluate(self):
+        """
+        Returns the heuristic value for the side to move.
+        """
+        return self.score if len(self.history) % 2 == 0 else -self.score
+
+    def candidates(self):
+        """
+        Returns the empty cells worth searching: all of them on small
+        boards, otherwise those within two cells of a stone.
+        """
+        empty = [cell for cell, value in enumerate(self.cells)
+                 if value is EMPTY]
+        if len(self.cells) <= SMALL_BOARD or not self.history:
+            if not self.history and len(self.cells) > SMALL_BOARD:
+                return [(self.rows // 2) * self.columns + self.columns // 2]
+            return empty
+        near = set()
+        for cell, _ in self.history:
+            i, j = divmod(cell, self.columns)
+            for di in range(-2, 3):
+                for dj in range(-2, 3):
+                    ni, nj = i + di, j + dj
+                    if 0 <= ni < self.rows and 0 <= nj < self.columns:
+                        near.add(ni * self.columns + nj)
+        return [cell for cell in empty if cell in near]
+
+    def urgency(self, cell):
+        """
+        Returns how much a cell matters to either side, for move ordering.
+        """
+        urgency = 0
+        weights = self.weights
+        for w in self.cell_windows[cell]:
+            x, o = self.counts[w]
+            if o == 0:
+                urgency += weights[x]
+            if x == 0:
+                urgency += weights[o]
+        return urgency
+
+
+def window_value(counts, weights):
+    x, o = counts
+    if x and o:
+        return 0
+    return weights[x] - weights[o]
+
+
+class Search():
+    def __init__(self, board, budget=BUDGET, max_depth=None):
+        self.board = board
+        self.budget = budget
+        self.max_depth = max_depth
+        self.deadline = None
+        self.nodes = 0
+        # Zobrist hash -> (depth, value, bound, best cell)
+        self.table = {}
+
+    def run(self):
+        """
+        Returns (cell, info) for the best move found by iterative
+        deepening within the budget; info has the depth completed,
+        nodes searched, value and seconds used.
+        """
+        board = self.board
+        start = time.monotonic()
+        self.deadline = start + self.budget
+        remaining = len(board.cells) - len(board.history)
+        limit = remaining if self.max_depth is None else min(
+            remaining, self.max_depth
+        )
+
+        moves = self.ordered(board.candidates(), None)
+        best_cell, best_value, depth_done = moves[0], None, 0
+        for depth in range(1, limit + 1):
+            try:
+                value, cell = self.root(moves, depth)
+            except Timeout:
+                break
+            best_cell, best_value, depth_done = cell, value, depth
+            # Search the previous best move first at the next depth
+            moves.remove(cell)
+            moves.insert(0, cell)
+            if abs(value) >= WIN - len(board.cells):
+                break
+
+        return best_cell, {
+            "depth": depth_done,
+            "nodes": self.nodes,
+            "value": best_value,
+            "seconds": round(time.monotonic() - start, 4),
+        }
+
+    def root(self, moves, depth):
+        alpha, beta = -WIN - 1, WIN + 1
+        best_cell = None
+        for cell in moves:
+            self.board.play(cell)
+            try:
+                value = -self.negamax(depth - 1, -beta, -alpha, 1)
+            finally:
+                self.board.undo()
+            if best_cell is None or value > alpha:
+                alpha = value
+                best_cell = cell
+        return alpha, best_cell
+
+    def negamax(self, depth, alpha, beta, ply):
+        """
+        Returns the value for the side to move, searching depth more
+        plies; exact strictly between alpha and beta, a bound otherwise.
+        """
+        board = self.board
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.monotonic() > self.deadline:
+            raise Timeout
+
+        if board.winner is not None:
+            # The previous move won
+            return -(WIN - ply)
+        if board.full():
+            return 0
+        if depth == 0:
+            return board.evaluate()
+
+        entry = self.table.get(board.hash)
+        hint = None
+        if entry is not None:
+            entry_depth, value, bound, hint = entry
+            if entry_depth >= depth and (
+                    bound == 0
+                    or (bound > 0 and value >= beta)
+                    or (bound < 0 and value <= alpha)):
+                return value
+
+        original_alpha = alpha
+        best_value = -WIN - 1
+        best_cell = None
+        for cell in self.ordered(board.candidates(), hint):
+            board.play(cell)
+            try:
+                value = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo()
+            if value > best_value:
+                best_value = value
+                best_cell = cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        # Bound: 0 exact, 1 lower, -1 upper
+        if best_value <= original_alpha:
+            bound = -1
+        elif best_value >= beta:
+            bound = 1
+        else:
+            bound = 0
+        self.table[board.hash] = (depth, best_value, bound, best_cell)
+        return best_value
+
+    def ordered(self, cells, hint):
+        cells = sorted(cells, key=self.board.urgency, reverse=True)
+        if hint in cells:
+            cells.remove(hint)
+            cells.insert(0, hint)
+        return cells
+
+
+def best_move(board, budget=BUDGET, max_depth=None):
+    """
+    Returns ((i, j), info) for the side to move on a Board.
+    """
+    if board.terminal():
+        return None, {"depth": 0, "nodes": 0, "value": None, "seconds": 0}
+    cell, info = Search(board, budget, max_depth).run()
+    return divmod(cell, board.columns), info
+
+
+def minimax(board, k=3, budget=BUDGET):
+    """
+    Returns the best action for a list-of-lists board of any size.
+    """
+    global nodes
+    action, info = best_move(Board.from_lists(board, k), budget)
+    nodes = info["nodes"]
+    return action
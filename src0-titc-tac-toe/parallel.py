@@ -0,0 +1,209 @@
+"""
+Parallel root-split search for the m,n,k engine.
+
+Each iteration searches the first (previous best) root move in the
+parent, then hands the younger brothers to a process pool. Workers
+share the best (value, move index) found so far and start their
+alpha-beta window from it, so a strong early move prunes the others.
+
+Results match the serial search at the same depth: a position's depth-
+limited value does not depend on the window it was searched with, and
+ties go to the move earliest in root order. A worker searching a move
+that comes before the current best uses alpha - 1, so it still returns
+the exact value when it ties. Workers keep a transposition table for
+the iterations of one best_move call and start a new one for the next.
+Only the depth reached within a time budget can vary between runs; pass
+max_depth for repeatable results. Node counts still vary slightly, as
+they depend on when each worker sees the shared best value.
+
+Usage: python parallel.py [rows columns k] [--depth D] [--workers N]
+prints serial and parallel timings for an opening position.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import mnk
+
+# Pool reused across moves, with the shared [value, index] array
+pool = None
+pool_workers = None
+shared = None
+
+# Number of best_move calls so far, so workers start a new table for each
+generation = 0
+
+# Worker state: the best-so-far array and the table of the root position
+best = None
+table = {}
+table_root = None
+
+
+def init_worker(array):
+    global best
+    best = array
+
+
+def search_move(root, board, index, depth, seconds):
+    """
+    Returns (value, nodes) for root move number index, where board is
+    the position after that move, or (None, nodes) if the time ran out.
+    """
+    global table, table_root
+    # Entries from an earlier root, or an earlier search of this one, may
+    # be deeper than this search asks for, which would make the result
+    # and node count differ from the serial search
+    if table_root != root:
+        table = {}
+        table_root = root
+
+    with best.get_lock():
+        best_value, best_index = best[0], best[1]
+    alpha = best_value if best_index < index else best_value - 1
+
+    search = mnk.Search(board)
+    search.table = table
+    search.deadline = time.monotonic() + seconds
+    try:
+        value = -search.negamax(depth - 1, -mnk.WIN - 1, -alpha, 1)
+    except mnk.Timeout:
+        return None, search.nodes
+
+    with best.get_lock():
+        if value > best[0] or (value == best[0] and index < best[1]):
+            best[0], best[1] = value, index
+    return value, search.nodes
+
+
+def start(workers=None):
+    """
+    Starts (or restarts with a new size) the shared process pool.
+    """
+    global pool, pool_workers, shared
+    workers = workers or os.cpu_count() or 1
+    if pool is not None and pool_workers == workers:
+        return
+    close()
+    shared = multiprocessing.Array("q", 2)
+    pool = multiprocessing.Pool(
+        workers, initializer=init_worker, initargs=(shared,)
+    )
+    pool_workers = workers
+
+
+def close():
+    global pool, pool_workers
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    pool = None
+    pool_workers = None
+
+
+class SplitSearch(mnk.Search):
+    def root(self, moves, depth):
+        """
+        Returns (value, cell) for one iteration: the first move in the
+        parent, the rest in the pool. Raises mnk.Timeout if any move
+        did not finish.
+        """
+        board = self.board
+        board.play(moves[0])
+        try:
+            value = -self.negamax(depth - 1, -mnk.WIN - 1, mnk.WIN + 1, 1)
+        finally:
+            board.undo()
+        shared[0], shared[1] = value, 0
+
+        root = (generation, board.rows, board.columns, board.k, board.hash)
+        tasks = []
+        for index, cell in enumerate(moves[1:], 1):
+            board.play(cell)
+            tasks.append((root, board_copy(board), index, depth,
+                          self.deadline - time.monotonic()))
+            board.undo()
+
+        timed_out = False
+        for value, nodes in pool.starmap(search_move, tasks):
+            self.nodes += nodes
+            timed_out = timed_out or value is None
+        if timed_out:
+            raise mnk.Timeout
+
+        # Moves that failed low only returned a bound below the best
+        value, index = shared[0], shared[1]
+        return value, moves[index]
+
+
+def board_copy(board):
+    copy = mnk.Board(board.rows, board.columns, board.k)
+    copy.cells = list(board.cells)
+    copy.counts = [list(counts) for counts in board.counts]
+    copy.history = list(board.history)
+    copy.winner = board.winner
+    copy.score = board.score
+    copy.hash = board.hash
+    return copy
+
+
+def best_move(board, budget=mnk.BUDGET, max_depth=None, workers=None):
+    """
+    Returns ((i, j), info) like mnk.best_move, splitting each
+    iteration's root moves over the pool.
+    """
+    global generation
+    if board.terminal():
+        return None, {"depth": 0, "nodes": 0, "value": None, "seconds": 0}
+    start(workers)
+    generation += 1
+    cell, info = SplitSearch(board, budget, max_depth).run()
+    return divmod(cell, board.columns), info
+
+
+def opening(rows, columns, k, stones):
+    """
+    Returns a board after the engine plays stones quick moves itself.
+    """
+    board = mnk.Board(rows, columns, k)
+    for _ in range(stones):
+        (i, j), _ = mnk.best_move(board, max_depth=2)
+        board.play(i * columns + j)
+    return board
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("shape", nargs="*", type=int, default=[9, 9, 5])
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--stones", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    if len(args.shape) != 3:
+        parser.error("shape is rows columns k")
+
+    board = opening(*args.shape, args.stones)
+    budget = float("inf")
+
+    started = time.perf_counter()
+    serial, serial_info = mnk.best_move(board, budget, args.depth)
+    serial_seconds = time.perf_counter() - started
+
+    start(args.workers)
+    started = time.perf_counter()
+    split, split_info = best_move(board, budget, args.depth, args.workers)
+    split_seconds = time.perf_counter() - started
+    close()
+
+    print(f"Serial:   move {serial} value {serial_info['value']} "
+          f"nodes {serial_info['nodes']} in {serial_seconds:.3f}s")
+    print(f"Parallel: move {split} value {split_info['value']} "
+          f"nodes {split_info['nodes']} in {split_seconds:.3f}s "
+          f"({args.workers or os.cpu_count() or 1} workers)")
+    same = (serial, serial_info["value"]) == (split, split_info["value"])
+    print(f"Speedup:  {serial_seconds / split_seconds:.2f}x, "
+          f"same result: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Precomputed perfect-play table for Tic Tac Toe.
+
+Every reachable position is solved once. The table holds one byte per
+base-3 board index (3^9 entries): the low nibble is the best move's
+bit number (NO_MOVE for finished games) and the high nibble is the game
+value + 1. Run this file to regenerate perfect_play.bin.
+"""
+import os
+import sys
+
+import bitboard
+from tictactoe import X, O
+
+TABLE_NAME = "perfect_play.bin"
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          TABLE_NAME)
+
+SIZE = 3 ** 9
+
+NO_MOVE = 15
+
+# Filled in from TABLE_PATH (or solved) on first lookup
+table = None
+
+
+def index(board):
+    """
+    Returns the base-3 index of a board, with X as 1 and O as 2.
+    """
+    key = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            key = key * 3 + (1 if cell == X else 2 if cell == O else 0)
+    return key
+
+
+def mask_index(x, o):
+    """
+    Returns the base-3 index of the position with masks x and o.
+    """
+    key = 0
+    for bit in range(8, -1, -1):
+        key = key * 3 + (1 if x >> bit & 1 else 2 if o >> bit & 1 else 0)
+    return key
+
+
+def solve():
+    """
+    Returns the table for every position reachable from the empty board.
+    """
+    solved = bytearray([0xFF]) * SIZE
+
+    def value(x, o):
+        key = mask_index(x, o)
+        if solved[key] != 0xFF:
+            return (solved[key] >> 4) - 1
+        if bitboard.over(x, o):
+            best_value, best_move = bitboard.score(x, o), NO_MOVE
+        else:
+            maximizing = bitboard.to_move(x, o)
+            empty = bitboard.legal_moves(x, o)
+            best_value, best_move = None, NO_MOVE
+            for move in bitboard.MOVE_ORDER:
+                if not empty >> move & 1:
+                    continue
+                child = value(*bitboard.play(x, o, move))
+                if (best_value is None
+                        or (maximizing and child > best_value)
+                        or (not maximizing and child < best_value)):
+                    best_value, best_move = child, move
+        solved[key] = (best_value + 1) << 4 | best_move
+        return best_value
+
+    value(0, 0)
+    return solved
+
+
+def load():
+    """
+    Loads the table from TABLE_PATH, solving it if the file is missing
+    or damaged.
+    """
+    global table
+    try:
+        with open(TABLE_PATH, "rb") as f:
+            data = f.read()
+        if len(data) != SIZE:
+            raise ValueError("wrong table size")
+        table = data
+    except (OSError, ValueError):
+        table = bytes(solve())
+
+
+def lookup(board):
+    """
+    Returns (value, action) for a board from the table, where value
+    is 1, 0 or -1 as in utility and action is None for finished games.
+    """
+    if table is None:
+        load()
+    entry = table[index(board)]
+    if entry == 0xFF:
+        raise ValueError("board is not reachable in a legal game")
+    move = entry & 0x0F
+    return (entry >> 4) - 1, None if move == NO_MOVE else divmod(move, 3)
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    return lookup(board)[1]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) == 2 else TABLE_PATH
+    solved = solve()
+    with open(path, "wb") as f:
+        f.write(solved)
+    positions = sum(entry != 0xFF for entry in solved)
+    print(f"Solved {positions} positions into {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import sys
 import time
 
 import tictactoe as ttt
+from worker import Worker
 
 pygame.init()
 size = width, height = 600, 400
@@ -17,14 +18,22 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Frames per second, and the least time the computer appears to think
+fps = 30
+think_time = 0.5
+
+clock = pygame.time.Clock()
+worker = Worker(ponder="--ponder" in sys.argv)
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+ai_started = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            worker.close()
             sys.exit()
 
     screen.fill(black)
@@ -102,21 +111,24 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = int(time.time() * 2) % 3 + 1
+            title = "Computer thinking" + "." * dots
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, searched in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if not worker.thinking():
+                worker.request(board)
+                ai_started = time.time()
+            elif time.time() - ai_started >= think_time:
+                move = worker.poll()
+                if move is not None:
+                    board = ttt.result(board, move)
+        elif user == player and not game_over:
+            worker.ponder(board)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +153,7 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    worker.cancel()
 
     pygame.display.flip()
+    clock.tick(fps)
@@ -0,0 +1,133 @@
+"""
+Symmetry-canonicalized search for Tic Tac Toe.
+
+Each board is mapped to one representative among its 8 rotations and
+reflections. Values and best moves are cached per representative, and
+a cached move is mapped back to the orientation of the board asked
+about, so the cache and the search are up to 8 times smaller.
+"""
+from bitboard import MOVE_ORDER, WINS
+from tictactoe import X, O
+
+
+def rotate(cells):
+    """
+    Returns the cell permutation rotated a quarter turn clockwise.
+    """
+    return tuple(cells[3 * (2 - j) + i] for i in range(3) for j in range(3))
+
+
+def reflect(cells):
+    """
+    Returns the cell permutation mirrored left to right.
+    """
+    return tuple(cells[3 * i + (2 - j)] for i in range(3) for j in range(3))
+
+
+def dihedral():
+    """
+    Returns the 8 symmetries of the square as permutations p, where
+    the transformed board's cell k is the original board's cell p[k].
+    """
+    identity = tuple(range(9))
+    symmetries = []
+    for start in (identity, reflect(identity)):
+        cells = start
+        for _ in range(4):
+            symmetries.append(cells)
+            cells = rotate(cells)
+    return symmetries
+
+
+SYMMETRIES = dihedral()
+
+# Maps representatives to (value, best move in the representative's cells)
+cache = {}
+
+# Positions searched by the most recent minimax call
+nodes = 0
+
+
+def board_key(board):
+    """
+    Returns the 9-tuple of 0/1/2 cell codes for a list-of-lists board.
+    """
+    return tuple(1 if cell == X else 2 if cell == O else 0
+                 for row in board for cell in row)
+
+
+def canonical(key):
+    """
+    Returns the smallest of a key's 8 symmetric images and the
+    permutation that produced it.
+    """
+    best = None
+    best_symmetry = None
+    for symmetry in SYMMETRIES:
+        image = tuple(key[cell] for cell in symmetry)
+        if best is None or image < best:
+            best = image
+            best_symmetry = symmetry
+    return best, best_symmetry
+
+
+def winner_of(key):
+    # Cells are numbered 3 * i + j, as bits are in bitboard's masks
+    x = o = 0
+    for cell, code in enumerate(key):
+        if code == 1:
+            x |= 1 << cell
+        elif code == 2:
+            o |= 1 << cell
+    return 1 if WINS[x] else 2 if WINS[o] else 0
+
+
+def solve(key):
+    """
+    Returns (value, move) for a key, with value 1, 0 or -1 as in
+    utility and move the best cell number in the key's own orientation,
+    or None if the game is over.
+    """
+    global nodes
+    representative, symmetry = canonical(key)
+    if representative not in cache:
+        nodes += 1
+        cache[representative] = search(representative)
+    value, move = cache[representative]
+    return value, None if move is None else symmetry[move]
+
+
+def search(key):
+    """
+    Returns (value, move) for a representative key by trying every move
+    and solving the resulting positions through the cache.
+    """
+    won = winner_of(key)
+    if won:
+        return (1 if won == 1 else -1), None
+    if 0 not in key:
+        return 0, None
+
+    maximizing = key.count(1) == key.count(2)
+    mark = 1 if maximizing else 2
+    best_value, best_move = None, None
+    for move in MOVE_ORDER:
+        if key[move]:
+            continue
+        child = key[:move] + (mark,) + key[move + 1:]
+        value, _ = solve(child)
+        if (best_value is None
+                or (maximizing and value > best_value)
+                or (not maximizing and value < best_value)):
+            best_value, best_move = value, move
+    return best_value, best_move
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    global nodes
+    nodes = 0
+    _, move = solve(board_key(board))
+    return None if move is None else divmod(move, 3)
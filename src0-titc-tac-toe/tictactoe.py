@@ -8,6 +8,21 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# Positions visited by the most recent minimax call
+nodes = 0
+
+# Transposition table: board key -> (value, bound, best action)
+table = {}
+
+# Kinds of value stored in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Center first, then corners, then edges: the likeliest good moves
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
 
 def initial_state():
     """
@@ -129,16 +144,28 @@ def utility(board):
     return -1
 
 
-def minimax(board):
+def minimax(board, search="alphabeta"):
     """
     Returns the optimal action for the current player on the board.
+
+    search picks the strategy from SEARCHES; the number of positions
+    it visited is left in the module-level nodes counter.
     """
+    global nodes
+    nodes = 0
 
     if board == initial_state():
         return (0,0)
     if terminal(board):
         return None
-    
+
+    return SEARCHES[search](board)
+
+
+def full_search(board):
+    """
+    Returns the optimal action by searching the whole game tree.
+    """
     current_player = player(board)
 
     if current_player == X:
@@ -148,7 +175,133 @@ def minimax(board):
         _, action = min_value(board)
         return action
 
+
+def alphabeta_search(board):
+    """
+    Returns the optimal action using alpha-beta pruning, move ordering
+    and the transposition table.
+    """
+    _, action = alphabeta(board, -math.inf, math.inf)
+    return action
+
+
+def alphabeta(board, alpha, beta):
+    """
+    Returns [value, action] for the board, where value is exact if it
+    lies strictly between alpha and beta and a bound on it otherwise.
+    """
+    global nodes
+    nodes += 1
+
+    key = board_key(board)
+    entry = table.get(key)
+    hint = None
+    if entry is not None:
+        value, bound, hint = entry
+        if (bound == EXACT
+                or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)):
+            return [value, hint]
+
+    if terminal(board):
+        value = utility(board)
+        table[key] = (value, EXACT, None)
+        return [value, None]
+
+    maximizing = player(board) == X
+    original_alpha, original_beta = alpha, beta
+    value = -math.inf if maximizing else math.inf
+    best_action = None
+    for action in ordered_actions(board, hint):
+        child_value, _ = alphabeta(result(board, action), alpha, beta)
+        if maximizing and child_value > value:
+            value = child_value
+            best_action = action
+            alpha = max(alpha, value)
+        elif not maximizing and child_value < value:
+            value = child_value
+            best_action = action
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+
+    if value <= original_alpha:
+        bound = UPPER
+    elif value >= original_beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    table[key] = (value, bound, best_action)
+    return [value, best_action]
+
+
+def bitboard_search(board):
+    """
+    Returns the optimal action using the bitboard engine.
+    """
+    import bitboard
+    global nodes
+    action = bitboard.minimax(board)
+    nodes = bitboard.nodes
+    return action
+
+
+def table_search(board):
+    """
+    Returns the optimal action from the precomputed perfect-play table.
+    """
+    import perfect_play
+    global nodes
+    nodes = 1
+    return perfect_play.minimax(board)
+
+
+def symmetry_search(board):
+    """
+    Returns the optimal action from the search cached per symmetry class.
+    """
+    import symmetry
+    global nodes
+    action = symmetry.minimax(board)
+    nodes = symmetry.nodes
+    return action
+
+
+def iterative_search(board):
+    """
+    Returns the action from the m,n,k engine's iterative deepening
+    search, which solves 3x3 boards well within its time budget.
+    """
+    import mnk
+    global nodes
+    action = mnk.minimax(board)
+    nodes = mnk.nodes
+    return action
+
+
+def ordered_actions(board, hint=None):
+    """
+    Returns the available actions, the hinted best action first and
+    the rest in MOVE_ORDER.
+    """
+    ordered = [action for action in MOVE_ORDER
+               if board[action[0]][action[1]] == EMPTY]
+    if hint in ordered:
+        ordered.remove(hint)
+        ordered.insert(0, hint)
+    return ordered
+
+
+def board_key(board):
+    """
+    Returns a hashable key for a board.
+    """
+    return tuple(cell for row in board for cell in row)
+
+
 def min_value(board):
+    global nodes
+    nodes += 1
     if terminal(board):
         return [utility(board), None]
     value = float('inf')
@@ -161,6 +314,8 @@ def min_value(board):
 
 
 def max_value(board):
+    global nodes
+    nodes += 1
     if terminal(board):
         return [utility(board), None]
     value = float('-inf')
@@ -173,6 +328,17 @@ def max_value(board):
     return [value, best_action]
 
 
+# Search strategies selectable through minimax
+SEARCHES = {
+    "minimax": full_search,
+    "alphabeta": alphabeta_search,
+    "bitboard": bitboard_search,
+    "table": table_search,
+    "symmetry": symmetry_search,
+    "iterative": iterative_search,
+}
+
+
 def has_empty_spaces(board):
     empty_counter = 0
     for row in board:
@@ -0,0 +1,91 @@
+"""
+Background AI for runner.py.
+
+Searches run on one worker thread so the pygame loop keeps drawing
+frames while the computer thinks. Each search is keyed by the board it
+answers; stale searches are cancelled if they have not started yet and
+their results are dropped otherwise. With pondering on, the worker
+searches the computer's reply to every move the user could make while
+the user is thinking, so the reply is usually ready at once.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import tictactoe as ttt
+
+
+def board_key(board):
+    return tuple(tuple(row) for row in board)
+
+
+class Worker():
+    def __init__(self, search=ttt.minimax, ponder=False):
+        self.search = search
+        self.pondering = ponder
+        self.executor = ThreadPoolExecutor(1)
+        # Maps board keys to the futures of their searches
+        self.futures = {}
+        # Board whose move the runner is waiting for
+        self.wanted = None
+        # Board whose replies have been pondered
+        self.pondered = None
+
+    def submit(self, board):
+        key = board_key(board)
+        if key not in self.futures:
+            self.futures[key] = self.executor.submit(self.search, board)
+        return key
+
+    def request(self, board):
+        """
+        Starts searching for the move on board, unless that search was
+        already pondered, and cancels every other search.
+        """
+        self.wanted = self.submit(board)
+        self.cancel(keep=self.wanted)
+
+    def thinking(self):
+        return self.wanted is not None
+
+    def poll(self):
+        """
+        Returns the move for the requested board once it is ready,
+        None while the search is still running.
+        """
+        if self.wanted is None:
+            return None
+        future = self.futures[self.wanted]
+        if not future.done():
+            return None
+        del self.futures[self.wanted]
+        self.wanted = None
+        return future.result()
+
+    def ponder(self, board):
+        """
+        Queues searches for the computer's reply to each user move on
+        board, if pondering is on.
+        """
+        key = board_key(board)
+        if not self.pondering or self.pondered == key:
+            return
+        self.pondered = key
+        for action in sorted(ttt.actions(board)):
+            reply = ttt.result(board, action)
+            if not ttt.terminal(reply):
+                self.submit(reply)
+
+    def cancel(self, keep=None):
+        """
+        Cancels every search except the one for board key keep.
+        Searches already running finish, but their results are dropped.
+        """
+        for key in list(self.futures):
+            if key != keep:
+                self.futures.pop(key).cancel()
+        if keep is None:
+            self.wanted = None
+            self.pondered = None
+
+    def close(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,208 @@
+"""
+Tseitin CNF compiler for logic sentences.
+
+Each connective gets one variable and a few clauses making it equal to
+its operands, so the CNF grows linearly with the sentence instead of
+exponentially as with distribution. Definitions are keyed on their
+operand literals after normalization (operands sorted and deduplicated,
+Or as a negated And, Implication as Or, Biconditional with positive
+operands), so identical subformulas share one variable even when they
+are separate objects or written in a different order.
+
+Clauses are stored flat as integer literals in an array, with an array
+of clause end offsets, in the DIMACS convention: variable v is v when
+true and -v when false.
+"""
+from array import array
+
+from logic import Symbol, Not, And, Or, Implication, Biconditional, operands
+
+
+class ClauseStore():
+    def __init__(self):
+        self.literals = array("i")
+        # Offset in literals just past each clause
+        self.ends = array("q")
+
+    def __len__(self):
+        return len(self.ends)
+
+    def add(self, clause):
+        self.literals.extend(clause)
+        self.ends.append(len(self.literals))
+
+    def clause(self, index):
+        start = self.ends[index - 1] if index else 0
+        return self.literals[start:self.ends[index]].tolist()
+
+    def clauses(self, start=0):
+        """
+        Yields every clause from number start on as a list of literals.
+        """
+        for index in range(start, len(self.ends)):
+            yield self.clause(index)
+
+    def memory_bytes(self):
+        return (self.literals.itemsize * len(self.literals)
+                + self.ends.itemsize * len(self.ends))
+
+
+class CNF():
+    def __init__(self):
+        self.variables = 0
+        self.store = ClauseStore()
+        # Symbol names -> variables, and variables -> symbol names
+        self.symbols = {}
+        self.names = {}
+        # Normalized definitions -> literals
+        self.definitions = {}
+        # id(sentence) -> (sentence, literal) for sentences compiled
+        # already; the sentence is kept so its id stays unique. A
+        # conjunction extended with And.add afterwards is not recompiled
+        self.compiled = {}
+        self.true = None
+
+    def __len__(self):
+        return len(self.store)
+
+    def new_variable(self):
+        self.variables += 1
+        return self.variables
+
+    def add_clause(self, clause):
+        self.store.add(clause)
+
+    def constant(self):
+        """
+        Returns a literal that is always true.
+        """
+        if self.true is None:
+            self.true = self.new_variable()
+            self.add_clause([self.true])
+        return self.true
+
+    def symbol(self, name):
+        if name not in self.symbols:
+            variable = self.new_variable()
+            self.symbols[name] = variable
+            self.names[variable] = name
+        return self.symbols[name]
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to sentence, adding the clauses
+        that define it. Walks the sentence without recursion, so deep
+        sentences compile too.
+        """
+        stack = [(sentence, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in self.compiled:
+                continue
+            children = operands(node)
+            if not ready and children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children
+                             if id(child) not in self.compiled)
+                continue
+            literals = [self.compiled[id(child)][1] for child in children]
+            self.compiled[id(node)] = (node, self.define(node, literals))
+        return self.compiled[id(sentence)][1]
+
+    def define(self, sentence, literals):
+        """
+        Returns the literal for a sentence given its operands' literals.
+        """
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return -literals[0]
+        if isinstance(sentence, And):
+            return self.conjunction(literals)
+        if isinstance(sentence, Or):
+            return -self.conjunction([-literal for literal in literals])
+        if isinstance(sentence, Implication):
+            antecedent, consequent = literals
+            return -self.conjunction([antecedent, -consequent])
+        if isinstance(sentence, Biconditional):
+            return self.equivalence(*literals)
+        raise TypeError("must be a logical sentence")
+
+    def conjunction(self, literals):
+        unique = set(literals)
+        if any(-literal in unique for literal in unique):
+            return -self.constant()
+        literals = sorted(unique)
+        if self.true is not None:
+            if -self.true in literals:
+                return -self.constant()
+            literals = [literal for literal in literals
+                        if literal != self.true]
+        if not literals:
+            return self.constant()
+        if len(literals) == 1:
+            return literals[0]
+
+        key = ("and", *literals)
+        if key not in self.definitions:
+            v = self.new_variable()
+            for literal in literals:
+                self.add_clause([-v, literal])
+            self.add_clause([v] + [-literal for literal in literals])
+            self.definitions[key] = v
+        return self.definitions[key]
+
+    def equivalence(self, left, right):
+        # left <=> right is unchanged by negating both operands, and
+        # negated by negating one
+        sign = 1
+        if left < 0:
+            left, sign = -left, -sign
+        if right < 0:
+            right, sign = -right, -sign
+        if left == right:
+            return sign * self.constant()
+        left, right = min(left, right), max(left, right)
+
+        key = ("iff", left, right)
+        if key not in self.definitions:
+            v = self.new_variable()
+            self.add_clause([-v, -left, right])
+            self.add_clause([-v, left, -right])
+            self.add_clause([v, left, right])
+            self.add_clause([v, -left, -right])
+            self.definitions[key] = v
+        return sign * self.definitions[key]
+
+    def assert_sentence(self, sentence):
+        """
+        Adds clauses requiring sentence to be true. Top-level
+        conjunctions are asserted conjunct by conjunct.
+        """
+        pending = [sentence]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, And):
+                pending.extend(reversed(node.conjuncts))
+            else:
+                self.add_clause([self.literal(node)])
+
+    def dimacs(self):
+        """
+        Returns the clauses in DIMACS CNF format.
+        """
+        lines = [f"p cnf {self.variables} {len(self.store)}"]
+        for variable, name in sorted(self.names.items()):
+            lines.append(f"c {variable} {name}")
+        for clause in self.store.clauses():
+            lines.append(" ".join(map(str, clause)) + " 0")
+        return "\n".join(lines) + "\n"
+
+
+def compile_sentence(sentence):
+    """
+    Returns a CNF whose clauses are satisfiable exactly when sentence is.
+    """
+    cnf = CNF()
+    cnf.assert_sentence(sentence)
+    return cnf
@@ -0,0 +1,97 @@
+"""
+Compiled evaluators for logic sentences.
+
+A sentence is turned into the source of one Python function over a
+sequence of truth values indexed by symbol number, so evaluation is a
+single short-circuiting Python expression instead of a method call per
+node. Subformulas used more than once (the same object) and expressions
+nested deeper than MAX_NESTING are computed into temporaries first,
+which keeps the source linear in the sentence and within the parser's
+nesting limit.
+"""
+import itertools
+
+from logic import (Symbol, Not, And, Or, Implication, Biconditional,
+                   operands, parent_counts, post_order)
+
+# Deepest expression nesting before a temporary is introduced
+MAX_NESTING = 50
+
+
+def source(sentence, symbols):
+    """
+    Returns the source of a function evaluate(m) giving the truth of
+    sentence when m[i] is the truth of the symbol named symbols[i].
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+
+    # Shared subformulas are computed once, into a temporary
+    uses = parent_counts(sentence)
+
+    # id(node) -> (expression, nesting depth)
+    values = {}
+    lines = ["def evaluate(m):"]
+    for node in post_order(sentence):
+        children = operands(node)
+        if isinstance(node, Symbol):
+            try:
+                values[id(node)] = (f"m[{index[node.name]}]", 0)
+            except KeyError:
+                raise Exception(f"variable {node.name} not in model")
+            continue
+        args = [values[id(child)][0] for child in children]
+        depth = 1 + max((values[id(child)][1] for child in children),
+                        default=0)
+        if isinstance(node, Not):
+            expression = f"not {args[0]}"
+        elif isinstance(node, And):
+            expression = " and ".join(args) if args else "True"
+        elif isinstance(node, Or):
+            expression = " or ".join(args) if args else "False"
+        elif isinstance(node, Implication):
+            expression = f"not {args[0]} or {args[1]}"
+        elif isinstance(node, Biconditional):
+            expression = f"(not {args[0]}) == (not {args[1]})"
+        else:
+            raise TypeError("must be a logical sentence")
+
+        if uses[id(node)] > 1 or depth > MAX_NESTING:
+            temporary = f"t{len(lines)}"
+            lines.append(f"    {temporary} = {expression}")
+            values[id(node)] = (temporary, 0)
+        else:
+            values[id(node)] = (f"({expression})", depth)
+
+    lines.append(f"    return bool({values[id(sentence)][0]})")
+    return "\n".join(lines) + "\n"
+
+
+def compile_sentence(sentence, symbols=None):
+    """
+    Returns (evaluate, symbols): a function of a sequence of truth
+    values, and the symbol names they stand for (sorted by default).
+    """
+    if symbols is None:
+        symbols = sorted(sentence.symbols())
+    namespace = {}
+    exec(compile(source(sentence, symbols), "<sentence>", "exec"), namespace)
+    return namespace["evaluate"], symbols
+
+
+def evaluate(sentence, model):
+    """
+    Evaluates sentence in a model dict, like sentence.evaluate(model).
+    """
+    function, symbols = compile_sentence(sentence, list(model))
+    return function([model[name] for name in symbols])
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge entails query by evaluating the compiled
+    implication in every model.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    function, _ = compile_sentence(Implication(knowledge, query), symbols)
+    models = itertools.product((True, False), repeat=len(symbols))
+    return all(map(function, models))
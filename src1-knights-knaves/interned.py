@@ -0,0 +1,173 @@
+"""
+Hash-consed, immutable logic sentences.
+
+The classes here subclass those in logic with the same constructors,
+so `from interned import *` can replace `from logic import *`. Building
+a sentence returns the one existing object with the same structure, if
+there is one, so equal subformulas share memory and == is an identity
+test. Each node's hash is computed once when it is built (the same
+value logic would compute) and its symbol set on first use. Nodes are
+immutable: And and Or hold tuples, and And.add raises TypeError.
+
+The intern table holds nodes weakly, so unused sentences are freed.
+"""
+import weakref
+
+import logic
+
+__all__ = ["Sentence", "Symbol", "Not", "And", "Or", "Implication",
+           "Biconditional", "intern", "model_check"]
+
+# (class, arguments) -> the node built from them
+table = weakref.WeakValueDictionary()
+
+
+class Interned():
+    def __new__(cls, *args):
+        if cls is not Symbol:
+            args = tuple(intern(arg) for arg in args)
+        key = (cls, *args)
+        node = table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.args = args
+            node.setup(*args)
+            node.frozen_symbols = None
+            # The logic class's hash, now O(1) per child
+            node.hash_value = super(Interned, node).__hash__()
+            table[key] = node
+        return node
+
+    def __init__(self, *args):
+        # Attributes are set once, in __new__
+        pass
+
+    def __eq__(self, other):
+        if isinstance(other, Interned):
+            return self is other
+        if isinstance(other, logic.Sentence):
+            return intern(other) is self
+        return NotImplemented
+
+    def __hash__(self):
+        return self.hash_value
+
+    def __reduce__(self):
+        return (type(self), self.args)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "hash_value", None) is not None:
+            raise AttributeError("interned sentences are immutable")
+        object.__setattr__(self, name, value)
+
+    def symbols(self):
+        if self.frozen_symbols is None:
+            # Fill in the symbol sets bottom up, without recursion
+            stack = [(self, False)]
+            while stack:
+                node, ready = stack.pop()
+                if node.frozen_symbols is not None:
+                    continue
+                if isinstance(node, Symbol):
+                    symbols = frozenset([node.name])
+                elif not ready:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in node.args)
+                    continue
+                else:
+                    symbols = frozenset().union(
+                        *(child.frozen_symbols for child in node.args)
+                    )
+                object.__setattr__(node, "frozen_symbols", symbols)
+        # A fresh set, as callers may change what logic returns
+        return set(self.frozen_symbols)
+
+
+class Symbol(Interned, logic.Symbol):
+    def setup(self, name):
+        self.name = name
+
+
+class Not(Interned, logic.Not):
+    def setup(self, operand):
+        self.operand = operand
+
+
+class And(Interned, logic.And):
+    def setup(self, *conjuncts):
+        self.conjuncts = conjuncts
+
+    def add(self, conjunct):
+        raise TypeError("interned sentences are immutable; "
+                        "build And(*sentence.conjuncts, conjunct)")
+
+
+class Or(Interned, logic.Or):
+    def setup(self, *disjuncts):
+        self.disjuncts = disjuncts
+
+
+class Implication(Interned, logic.Implication):
+    def setup(self, antecedent, consequent):
+        self.antecedent = antecedent
+        self.consequent = consequent
+
+
+class Biconditional(Interned, logic.Biconditional):
+    def setup(self, left, right):
+        self.left = left
+        self.right = right
+
+
+# logic classes and their interned counterparts
+COUNTERPARTS = [
+    (logic.Symbol, Symbol),
+    (logic.Not, Not),
+    (logic.And, And),
+    (logic.Or, Or),
+    (logic.Implication, Implication),
+    (logic.Biconditional, Biconditional),
+]
+
+
+def intern(sentence):
+    """
+    Returns the interned sentence equal to a logic sentence.
+    """
+    if isinstance(sentence, Interned):
+        return sentence
+    logic.Sentence.validate(sentence)
+
+    # Convert bottom up, without recursion; done maps ids of logic
+    # nodes (kept alive by sentence) to interned nodes
+    done = {}
+    stack = [(sentence, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in done:
+            continue
+        if isinstance(node, Interned):
+            done[id(node)] = node
+            continue
+        children = logic.operands(node)
+        if not ready and children:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+            continue
+        for plain, interned in COUNTERPARTS:
+            if isinstance(node, plain):
+                break
+        else:
+            raise TypeError("must be a logical sentence")
+        if plain is logic.Symbol:
+            done[id(node)] = Symbol(node.name)
+        else:
+            done[id(node)] = interned(
+                *(done[id(child)] for child in children)
+            )
+    return done[id(sentence)]
+
+
+Sentence = logic.Sentence
+
+model_check = logic.model_check
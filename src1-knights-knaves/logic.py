@@ -225,8 +225,65 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
+def operands(sentence):
+    """Returns the sentences a sentence is built from, in order."""
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    if isinstance(sentence, Or):
+        return sentence.disjuncts
+    if isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    if isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    return []
+
+
+def parent_counts(sentence):
+    """
+    Returns {id(node): number of parents} for every node of sentence,
+    so subformulas shared by several parents (the same object) count
+    once per parent.
+    """
+    uses = {}
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        uses[id(node)] = uses.get(id(node), 0) + 1
+        if uses[id(node)] == 1:
+            stack.extend(operands(node))
+    return uses
+
+
+def post_order(sentence):
+    """
+    Yields every distinct node of sentence once, after its operands and
+    left to right, without recursion so deep sentences work too.
+    """
+    done = set()
+    stack = [(sentence, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in done:
+            continue
+        children = operands(node)
+        if not ready and children:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children)
+                         if id(child) not in done)
+            continue
+        done.add(id(node))
+        yield node
+
+
+def model_check(knowledge, query, method="enumerate"):
     """Checks if knowledge base entails query."""
+    return CHECKS[method](knowledge, query)
+
+
+def enumerate_check(knowledge, query):
+    """Checks entailment by enumerating every model."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +318,30 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def sat_check(knowledge, query):
+    """Checks entailment by refuting knowledge ∧ ¬query with a SAT solver."""
+    import sat
+    return sat.entails(knowledge, query)
+
+
+def compiled_check(knowledge, query):
+    """Checks entailment by enumerating models with a compiled evaluator."""
+    import compiled
+    return compiled.entails(knowledge, query)
+
+
+def truthtable_check(knowledge, query):
+    """Checks entailment over bit-parallel truth tables with NumPy."""
+    import truthtable
+    return truthtable.entails(knowledge, query)
+
+
+# Entailment checkers by name, for model_check's method
+CHECKS = {
+    "enumerate": enumerate_check,
+    "sat": sat_check,
+    "compiled": compiled_check,
+    "truthtable": truthtable_check,
+}
@@ -0,0 +1,368 @@
+"""
+SAT-based entailment for logic sentences.
+
+Knowledge entails a query exactly when knowledge ∧ ¬query has no model.
+Sentences are compiled to clauses by cnf, and a CDCL solver decides
+satisfiability: unit propagation with two watched literals per clause,
+first-UIP clause learning with non-chronological backjumping, VSIDS
+decisions with phase saving, and geometric restarts.
+
+Literals are non-zero integers: variable v is v when true and -v when
+false.
+"""
+import heapq
+
+import cnf
+
+# Conflicts before the first restart, and the growth of that limit
+RESTART_FIRST = 100
+RESTART_GROWTH = 1.5
+
+# Activity decay per conflict
+DECAY = 0.95
+
+# Learnt clauses kept before the first reduction, and its growth
+LEARNTS_FIRST = 2000
+LEARNTS_GROWTH = 1.1
+
+
+def watch_index(literal):
+    return 2 * literal if literal > 0 else -2 * literal + 1
+
+
+class Solver():
+    def __init__(self):
+        self.variables = 0
+        # Per variable: 1 true, -1 false, 0 unassigned
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        # Clauses watching each literal, by watch_index
+        self.watches = [[], []]
+        self.clauses = []
+        self.learnts = []
+        self.trail = []
+        # Start of each decision level in the trail
+        self.trail_limits = []
+        # Trail position of the next literal to propagate
+        self.head = 0
+        self.heap = []
+        self.increment = 1.0
+        self.max_learnts = LEARNTS_FIRST
+        # False once the clauses are known to be unsatisfiable
+        self.ok = True
+        self.conflicts = 0
+        # Values of the last satisfying assignment
+        self.solution = None
+
+    def new_variable(self):
+        self.variables += 1
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        self.watches.append([])
+        self.watches.append([])
+        heapq.heappush(self.heap, (0.0, self.variables))
+        return self.variables
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds the clause (a disjunction of literals). Must be called
+        between solves, when only level 0 facts are assigned.
+        """
+        if not self.ok:
+            return
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                # Already satisfied or a tautology
+                return
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+        else:
+            self.attach(clause)
+            self.clauses.append(clause)
+
+    def load(self, formula, start=0):
+        """
+        Adds the variables of a cnf.CNF and its clauses from number
+        start on. Returns the number of clauses it holds.
+        """
+        while self.variables < formula.variables:
+            self.new_variable()
+        for clause in formula.store.clauses(start):
+            self.add_clause(clause)
+        return len(formula)
+
+    def attach(self, clause):
+        self.watches[watch_index(clause[0])].append(clause)
+        self.watches[watch_index(clause[1])].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a clause
+        with all its literals false on conflict, None otherwise.
+        """
+        values = self.values
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches[watch_index(false_literal)]
+            kept = []
+            for position, clause in enumerate(watchers):
+                # Keep the false watched literal second
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                first_value = values[abs(first)]
+                if (first_value if first > 0 else -first_value) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for a literal that is not false to watch instead
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = values[abs(literal)]
+                    if (value if literal > 0 else -value) != -1:
+                        clause[1], clause[k] = literal, false_literal
+                        self.watches[watch_index(literal)].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if (first_value if first > 0 else -first_value) == -1:
+                        kept.extend(watchers[position + 1:])
+                        self.watches[watch_index(false_literal)] = kept
+                        return clause
+                    self.assign(first, clause)
+            self.watches[watch_index(false_literal)] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learnt clause, backjump level) for a conflict, learning
+        the first unique implication point clause.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        clause = conflict
+        index = len(self.trail) - 1
+        while True:
+            # A reason clause's first literal is the one it implied
+            for other in clause if literal is None else clause[1:]:
+                variable = abs(other)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == level:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learnt[0] = -literal
+
+        # Drop literals implied by the rest of the clause through their
+        # reasons
+        variables = {abs(other) for other in learnt}
+        learnt[1:] = [
+            other for other in learnt[1:]
+            if self.reasons[abs(other)] is None or any(
+                abs(reason) not in variables and self.levels[abs(reason)] > 0
+                for reason in self.reasons[abs(other)][1:]
+            )
+        ]
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the highest-level remaining literal second
+        deepest = max(range(1, len(learnt)),
+                      key=lambda k: self.levels[abs(learnt[k])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[v], v)
+                         for v in range(1, self.variables + 1)
+                         if self.values[v] == 0]
+            heapq.heapify(self.heap)
+        heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = literal > 0
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.heap,
+                           (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = start
+
+    def reduce(self):
+        """
+        At level 0, forgets the longer half of the learnt clauses and
+        every clause already satisfied, and rebuilds the watch lists.
+        """
+        self.learnts.sort(key=len)
+        del self.learnts[len(self.learnts) // 2:]
+        self.max_learnts *= LEARNTS_GROWTH
+
+        self.watches = [[] for _ in self.watches]
+        for clauses in (self.clauses, self.learnts):
+            kept = []
+            for clause in clauses:
+                if any(self.value(literal) == 1 for literal in clause):
+                    continue
+                # Every remaining clause has two unassigned literals,
+                # since level 0 is fully propagated
+                clause.sort(key=lambda literal: self.value(literal) == -1)
+                self.attach(clause)
+                kept.append(clause)
+            clauses[:] = kept
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the highest activity, or
+        None if every variable is assigned.
+        """
+        while self.heap:
+            _, variable = heapq.heappop(self.heap)
+            if self.values[variable] == 0:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every literal
+        in assumptions true, False otherwise. The solver is left at
+        level 0 either way, ready for more clauses.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restart = RESTART_FIRST
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                self.conflicts += 1
+                conflicts += 1
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.attach(learnt)
+                    self.learnts.append(learnt)
+                    self.assign(learnt[0], learnt)
+                self.increment /= DECAY
+                continue
+
+            if conflicts >= restart:
+                self.backtrack(0)
+                conflicts = 0
+                restart *= RESTART_GROWTH
+                if len(self.learnts) > self.max_learnts:
+                    self.reduce()
+                continue
+
+            # Assumptions take the first decision levels
+            if len(self.trail_limits) < len(assumptions):
+                literal = assumptions[len(self.trail_limits)]
+                value = self.value(literal)
+                if value == -1:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value == 0:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                self.solution = list(self.values)
+                self.backtrack(0)
+                return True
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable if self.phase[variable] else -variable, None)
+
+    def model(self):
+        """
+        Returns the set of true variables of the last satisfying solve.
+        """
+        return {v for v, value in enumerate(self.solution) if value == 1}
+
+
+def entails(knowledge, query):
+    """
+    Returns True if knowledge entails query, like logic.model_check.
+    """
+    formula = cnf.compile_sentence(knowledge)
+    query = formula.literal(query)
+    solver = Solver()
+    solver.load(formula)
+    return not solver.solve([-query])
+
+
+class Entailment():
+    """
+    Answers many queries against one knowledge base, keeping the
+    encoding and learnt clauses between queries.
+    """
+
+    def __init__(self, knowledge):
+        self.formula = cnf.compile_sentence(knowledge)
+        self.solver = Solver()
+        self.loaded = self.solver.load(self.formula)
+
+    def entails(self, query):
+        literal = self.formula.literal(query)
+        self.loaded = self.solver.load(self.formula, self.loaded)
+        return not self.solver.solve([-literal])
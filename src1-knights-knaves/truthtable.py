@@ -0,0 +1,108 @@
+"""
+Bit-parallel truth-table model checking with NumPy.
+
+Models are numbered 0 to 2^n - 1, and symbol i is true in model m when
+bit i of m is set. Models are processed in chunks of 2^CHUNK_BITS, each
+held as packed 64-bit words, so one bitwise operation on a word
+evaluates a connective in 64 models. Symbols below CHUNK_BITS get fixed
+word patterns; higher symbols are constant within a chunk and stay
+scalars that NumPy broadcasts. The sentence is evaluated once per
+chunk, and entailment is a reduction over the resulting words.
+"""
+import numpy as np
+
+from logic import (Symbol, Not, And, Or, Implication, Biconditional,
+                   operands, parent_counts, post_order)
+
+# Models per chunk is 2^CHUNK_BITS: 2^20 models take 128 KiB per node
+CHUNK_BITS = 20
+
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+NONE = np.uint64(0)
+
+# Word patterns of the symbols that vary inside one 64-bit word
+WORD_PATTERNS = [
+    np.uint64(sum(1 << b for b in range(64) if b >> i & 1)) for i in range(6)
+]
+
+
+def columns(symbols, chunk, chunk_bits):
+    """
+    Returns {name: words} giving each symbol's truth in the models of
+    chunk number chunk, where a chunk holds 2^chunk_bits models.
+    """
+    words = max(1, (1 << chunk_bits) >> 6)
+    positions = np.arange(words, dtype=np.uint64)
+    result = {}
+    for i, name in enumerate(symbols):
+        if i >= chunk_bits:
+            result[name] = ALL if chunk >> (i - chunk_bits) & 1 else NONE
+        elif i < 6:
+            result[name] = np.full(words, WORD_PATTERNS[i], dtype=np.uint64)
+        else:
+            bit = (positions >> np.uint64(i - 6)) & np.uint64(1)
+            result[name] = np.where(bit == 1, ALL, NONE)
+    return result
+
+
+def evaluate(sentence, values):
+    """
+    Returns the words of sentence's truth, given the words of every
+    symbol in values. Intermediate words are released as soon as their
+    last parent has used them.
+    """
+    uses = parent_counts(sentence)
+    results = {}
+    for node in post_order(sentence):
+        children = operands(node)
+        args = []
+        for child in children:
+            args.append(results[id(child)])
+            uses[id(child)] -= 1
+            if uses[id(child)] == 0:
+                del results[id(child)]
+
+        if isinstance(node, Symbol):
+            try:
+                value = values[node.name]
+            except KeyError:
+                raise Exception(f"variable {node.name} not in model")
+        elif isinstance(node, Not):
+            value = ~args[0]
+        elif isinstance(node, And):
+            value = ALL
+            for arg in args:
+                value = value & arg
+        elif isinstance(node, Or):
+            value = NONE
+            for arg in args:
+                value = value | arg
+        elif isinstance(node, Implication):
+            value = ~args[0] | args[1]
+        elif isinstance(node, Biconditional):
+            value = ~(args[0] ^ args[1])
+        else:
+            raise TypeError("must be a logical sentence")
+        results[id(node)] = value
+    return results[id(sentence)]
+
+
+def entails(knowledge, query, chunk_bits=CHUNK_BITS):
+    """
+    Checks if knowledge entails query: the implication must hold in
+    every model, chunk by chunk.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    chunk_bits = min(chunk_bits, len(symbols))
+    # Below 64 models per chunk, only the low bits of the word count
+    if chunk_bits < 6:
+        padding = ALL << np.uint64(1 << chunk_bits)
+    else:
+        padding = NONE
+
+    implication = Implication(knowledge, query)
+    for chunk in range(1 << (len(symbols) - chunk_bits)):
+        words = evaluate(implication, columns(symbols, chunk, chunk_bits))
+        if not np.all((words | padding) == ALL):
+            return False
+    return True